@@ -2,9 +2,23 @@ from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from controllers.auth import router as auth_router
+from config.config import engine
+from config.logging_config import configure_logging, stop_logging
 from functions.auth import get_current_user_token
 from functions.found_item_forms import router as found_item_router
-
+from functions.geocoding import gazetteer
+from functions.live_feed import broker as live_feed_broker, router as live_feed_router
+from functions.offices import router as offices_router
+from functions.partitions import ensure_found_item_partitions
+from functions.photos import router as photos_router, shutdown_photo_pool
+from functions.pii_audit import shutdown_pii_audit
+from functions.pii_audit_log import router as pii_audit_router
+from functions.receipts import shutdown_receipt_pool
+from functions.rate_limit import LoadSheddingMiddleware, concurrency_limiter
+from functions.request_logging import RequestContextMiddleware
+from functions.token_revocation import revocation_filter
+
+configure_logging()
 
 app = FastAPI(
     title="api",
@@ -19,6 +33,67 @@ app.include_router(
     router=found_item_router
 )
 
+app.include_router(
+    router=photos_router
+)
+
+app.include_router(
+    router=live_feed_router
+)
+
+app.include_router(
+    router=offices_router
+)
+
+app.include_router(
+    router=pii_audit_router
+)
+
+
+@app.on_event("startup")
+def create_upcoming_partitions():
+    ensure_found_item_partitions(engine)
+
+
+@app.on_event("startup")
+def load_gazetteer():
+    # at startup, so a missing file is reported at deploy time, not on the first intake
+    gazetteer.places
+
+
+@app.on_event("startup")
+def load_revoked_tokens():
+    revocation_filter.refresh_if_stale()
+
+
+@app.on_event("startup")
+async def start_live_feed():
+    await live_feed_broker.start()
+
+
+@app.on_event("shutdown")
+def stop_photo_workers():
+    shutdown_photo_pool()
+
+
+@app.on_event("shutdown")
+def stop_receipt_workers():
+    shutdown_receipt_pool()
+
+
+@app.on_event("shutdown")
+async def stop_live_feed():
+    await live_feed_broker.stop()
+
+
+@app.on_event("shutdown")
+def flush_pii_audit():
+    shutdown_pii_audit()
+
+
+@app.on_event("shutdown")
+def flush_logs():
+    stop_logging()
 
 
 @app.get("/protected")
@@ -43,16 +118,25 @@ default_origins = [
 
 all_origins = list(set(allowed_origins + default_origins))
 
+app.add_middleware(
+    LoadSheddingMiddleware,
+    limiter=concurrency_limiter,
+    exclude_suffixes=("/stream",),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=all_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition", "Set-Cookie"],
+    expose_headers=["Content-Disposition", "Set-Cookie", "X-Request-ID"],
     max_age=3600,
 )
 
+# added last so it wraps everything, shed and CORS-rejected requests included
+app.add_middleware(RequestContextMiddleware)
+
 
 
 @app.get("/")
@@ -0,0 +1,219 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from sqlalchemy import event
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# past this many slow-query lines per second and worker, only a sample is logged
+SLOW_QUERY_LOG_PER_SECOND = int(os.getenv("SLOW_QUERY_LOG_PER_SECOND", "20"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "0.05"))
+SLOW_QUERY_MAX_STATEMENT = 2000
+
+# Set per request by RequestContextMiddleware. A dict rather than separate
+# variables: sync dependencies run in a copied context, so the user id they
+# find has to be written into the shared dict to reach the middleware.
+request_context: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_context", default=None)
+
+CONTEXT_FIELDS = ("request_id", "user_id", "route")
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def set_request_user(user_id) -> None:
+    ctx = request_context.get()
+    if ctx is not None and user_id is not None:
+        ctx["user_id"] = user_id
+
+
+def current_request_id() -> Optional[str]:
+    ctx = request_context.get()
+    return ctx["request_id"] if ctx else None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextQueueHandler(QueueHandler):
+    # Runs in the logging thread: resolve the message, attach the request
+    # context and hand off. Formatting and IO happen on the listener thread.
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        ctx = request_context.get()
+        if ctx:
+            for key in CONTEXT_FIELDS:
+                if getattr(record, key, None) is None:
+                    setattr(record, key, ctx.get(key))
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # a full queue drops the line instead of stalling the request
+        try:
+            if self.dropped:
+                record.dropped_before = self.dropped
+            self.queue.put_nowait(record)
+            self.dropped = 0
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.handlers = [ContextQueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        # flushes whatever is still queued
+        _listener.stop()
+        _listener = None
+
+
+# --- slow query log ---
+
+REDACTED = "[redacted]"
+_PII_PARAM = re.compile(r"(firstname|lastname|first_name|last_name|phone|email|password|token|secret)", re.I)
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_PHONE = re.compile(r"^\+?[\d\s().-]{9,}$")
+
+slow_query_logger = logging.getLogger("sql.slow")
+
+
+def _redact_value(value: Any) -> Any:
+    # catches PII bound under generic names such as lower_1 or param_1
+    if isinstance(value, str) and (_EMAIL.search(value) or _PHONE.match(value)):
+        return REDACTED
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_redact_value(v) for v in value]
+    return value
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {
+            key: REDACTED if _PII_PARAM.search(str(key)) else _redact_value(value)
+            for key, value in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        if parameters and all(isinstance(p, dict) for p in parameters):
+            # executemany: the first few rows are enough to see the shape
+            return [redact_parameters(p) for p in parameters[:3]]
+        return [_redact_value(v) for v in parameters]
+    return parameters
+
+
+class SlowQuerySampler:
+    # The first SLOW_QUERY_LOG_PER_SECOND slow queries of each second are
+    # logged; after that a random sample, so a database stall does not turn
+    # into a log flood on top of it.
+    def __init__(self, per_second: int, sample_rate: float):
+        self.per_second = per_second
+        self.sample_rate = sample_rate
+        self._window = 0
+        self._count = 0
+        self._skipped = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> tuple[bool, int]:
+        window = int(time.monotonic())
+        with self._lock:
+            if window != self._window:
+                self._window, self._count = window, 0
+            self._count += 1
+            if self._count <= self.per_second or random.random() < self.sample_rate:
+                skipped, self._skipped = self._skipped, 0
+                return True, skipped
+            self._skipped += 1
+            return False, 0
+
+
+slow_query_sampler = SlowQuerySampler(SLOW_QUERY_LOG_PER_SECOND, SLOW_QUERY_SAMPLE_RATE)
+
+
+def install_slow_query_log(engine, threshold_ms: float = SLOW_QUERY_MS) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("query_started")
+        if not stack:
+            return
+        duration_ms = (time.perf_counter() - stack.pop()) * 1000
+        if duration_ms < threshold_ms:
+            return
+        admitted, skipped = slow_query_sampler.admit()
+        if not admitted:
+            return
+        slow_query_logger.warning(
+            "slow query",
+            extra={
+                "duration_ms": round(duration_ms, 2),
+                "statement": statement[:SLOW_QUERY_MAX_STATEMENT],
+                "parameters": redact_parameters(parameters),
+                "rowcount": cursor.rowcount,
+                "executemany": executemany or None,
+                "skipped_since_last": skipped or None,
+            },
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        # a failed statement never reaches after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
@@ -1,12 +1,139 @@
-from fastapi import FastAPI, Depends
+import math
+import os
+import threading
+import time
+
+from fastapi import FastAPI, Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from config.config import SessionLocal, Base, engine
+from config.config import SessionLocal, ReplicaSessionLocal, Base, engine, replica_engine
+from functions.auth import get_current_user_token
+from functions.rate_limit import concurrency_limiter
 
 Base.metadata.create_all(bind=engine)
 
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "2"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+PRIMARY_PIN_COOKIE = "primary_pin"
+
+_state_lock = threading.Lock()
+# only one request probes the replica; the others keep the last answer meanwhile
+_replica_check_lock = threading.Lock()
+_pinned_users: dict[int, float] = {}
+_replica_down_until = 0.0
+_replica_lag_checked_at = 0.0
+_replica_lagging = False
+
+
+def _checkout(db: Session) -> None:
+    started = time.perf_counter()
+    db.connection()
+    concurrency_limiter.record_pool_wait(time.perf_counter() - started)
+
+
 def get_db():
     db = SessionLocal()
     try:
+        _checkout(db)
+        yield db
+    finally:
+        db.close()
+
+
+def pin_to_primary(response: Response, user_id: int) -> None:
+    until = time.time() + READ_YOUR_WRITES_SECONDS
+    with _state_lock:
+        if len(_pinned_users) > 10000:
+            now = time.time()
+            for uid in [u for u, t in _pinned_users.items() if t < now]:
+                del _pinned_users[uid]
+        _pinned_users[user_id] = until
+
+    # the cookie carries the pin to the other workers
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        str(int(until)),
+        max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+        httponly=True,
+        secure=True,
+        samesite="none",
+    )
+
+
+def _is_pinned(request: Request, user_id) -> bool:
+    now = time.time()
+    cookie = request.cookies.get(PRIMARY_PIN_COOKIE)
+    if cookie:
+        try:
+            if float(cookie) > now:
+                return True
+        except ValueError:
+            pass
+
+    with _state_lock:
+        until = _pinned_users.get(user_id)
+    return until is not None and until > now
+
+
+def _replica_usable() -> bool:
+    global _replica_lag_checked_at, _replica_lagging, _replica_down_until
+
+    now = time.monotonic()
+    if now < _replica_down_until:
+        return False
+    if now - _replica_lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+        return not _replica_lagging
+
+    if not _replica_check_lock.acquire(blocking=False):
+        return not _replica_lagging
+    try:
+        if now - _replica_lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+            return not _replica_lagging
+        _replica_lag_checked_at = now
+
+        try:
+            with replica_engine.connect() as conn:
+                lag = conn.execute(text("""
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                    END
+                """)).scalar()
+        except OperationalError:
+            _replica_down_until = now + REPLICA_RETRY_SECONDS
+            return False
+
+        _replica_lagging = lag is not None and float(lag) > REPLICA_MAX_LAG_SECONDS
+        return not _replica_lagging
+    finally:
+        _replica_check_lock.release()
+
+
+def get_read_db(
+    request: Request,
+    token_data: dict = Depends(get_current_user_token),
+):
+    global _replica_down_until
+
+    db = None
+    if ReplicaSessionLocal is not None and not _is_pinned(request, token_data.get("user_id")) and _replica_usable():
+        db = ReplicaSessionLocal()
+        try:
+            _checkout(db)
+        except OperationalError:
+            db.close()
+            db = None
+            _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    try:
+        if db is None:
+            db = SessionLocal()
+            _checkout(db)
         yield db
     finally:
         db.close()
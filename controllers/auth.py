@@ -1,12 +1,22 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 import os
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from models.models import User
-from functions.auth import get_password_hash, verify_password, create_access_token, get_current_user_token
+from jose import JWTError
+from functions.auth import get_password_hash, verify_password, create_access_token, decode_access_token, get_current_user_token
+from functions.token_revocation import (
+    consume_refresh_token,
+    new_token_id,
+    register_refresh_token,
+    revocation_filter,
+    revoke_family,
+    revoke_payload,
+)
+from functions.rate_limit import rate_limit
 from schemas.auth_schemas import RegisterRequest, LoginRequest, UserResponse
-from context.db import get_db
+from context.db import get_db, get_read_db
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -16,7 +26,42 @@ def get_user_role(user: User) -> str:
         return user.role.value if hasattr(user.role, "value") else str(user.role)
     return "user"
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+
+def issue_token_pair(db: Session, user: User, family_id: str, parent_jti: str | None = None) -> tuple[str, str]:
+    access_expires = timedelta(hours=2)
+    refresh_expires = timedelta(hours=10)
+
+    token_data = {
+        "sub": user.email,
+        "user_id": user.id,
+        "role": get_user_role(user),
+        "fid": family_id,
+    }
+
+    access_token = create_access_token(token_data, expires_delta=access_expires)
+
+    refresh_jti = new_token_id()
+    refresh_token = create_access_token(
+        {**token_data, "type": "refresh", "jti": refresh_jti},
+        expires_delta=refresh_expires,
+    )
+    register_refresh_token(
+        db,
+        jti=refresh_jti,
+        family_id=family_id,
+        user_id=user.id,
+        expires_at=datetime.now(timezone.utc) + refresh_expires,
+        parent_jti=parent_jti,
+    )
+
+    return access_token, refresh_token
+
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("auth.register"))],
+)
 def register_user(payload: RegisterRequest, db: Session = Depends(get_db)):
     existing = db.query(User).filter(User.email == payload.email).first()
     if existing:
@@ -47,7 +92,7 @@ def register_user(payload: RegisterRequest, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(rate_limit("auth.login"))])
 def login_user(payload: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == payload.email).first()
     if not user or not verify_password(payload.password, user.hashed_password):
@@ -56,20 +101,8 @@ def login_user(payload: LoginRequest, db: Session = Depends(get_db)):
             detail="Invalid email or password",
         )
 
-    access_expires = timedelta(hours=2)
-    refresh_expires = timedelta(hours=10)
-
-    token_data = {
-        "sub": user.email,
-        "user_id": user.id,
-        "role": get_user_role(user),
-    }
-
-    access_token = create_access_token(token_data, expires_delta=access_expires)
-    refresh_token = create_access_token(
-        {**token_data, "type": "refresh"},
-        expires_delta=refresh_expires,
-    )
+    access_token, refresh_token = issue_token_pair(db, user, new_token_id())
+    db.commit()
 
     return {
         "detail": "Logged in successfully",
@@ -83,7 +116,7 @@ def login_user(payload: LoginRequest, db: Session = Depends(get_db)):
 def get_current_user(
     request: Request,
     token_data: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user = db.query(User).filter(User.id == token_data.get("user_id")).first()
     if not user:
@@ -100,7 +133,7 @@ def get_current_user(
     )
 
 
-@router.post("/refresh")
+@router.post("/refresh", dependencies=[Depends(rate_limit("auth.refresh"))])
 def refresh_token(request: Request, db: Session = Depends(get_db)):
     auth_header = request.headers.get("Authorization")
     if not auth_header:
@@ -121,45 +154,62 @@ def refresh_token(request: Request, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authorization header",
         )
-    
+
     try:
-        from functions.auth import decode_access_token
         payload = decode_access_token(refresh_token_value)
-        
-        if payload.get("type") != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
-            )
-        
-        user = db.query(User).filter(User.id == payload.get("user_id")).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found",
-            )
-        
-        access_expires = timedelta(hours=2)
-        token_data = {
-            "sub": user.email,
-            "user_id": user.id,
-            "role": get_user_role(user),
-        }
-        
-        access_token = create_access_token(token_data, expires_delta=access_expires)
-        
-        return {
-            "detail": "Token refreshed successfully",
-            "access_token": access_token,
-        }
-    except Exception as e:
+    except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
 
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+        )
+
+    if revocation_filter.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+        )
+
+    if not consume_refresh_token(db, payload["jti"]):
+        # a refresh token is only valid once: a second use means it leaked,
+        # so the whole family (and its access tokens) goes
+        revoke_family(db, payload["fid"], payload.get("user_id"))
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected",
+        )
+
+    user = db.query(User).filter(User.id == payload.get("user_id")).first()
+    if not user:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    access_token, new_refresh_token = issue_token_pair(db, user, payload["fid"], parent_jti=payload["jti"])
+    db.commit()
+
+    return {
+        "detail": "Token refreshed successfully",
+        "access_token": access_token,
+        "refresh_token": new_refresh_token,
+    }
+
 
 @router.post("/logout")
-def logout_user():
-    return {"detail": "Logged out successfully"}
+def logout_user(request: Request, db: Session = Depends(get_db)):
+    try:
+        token_data = get_current_user_token(request)
+    except HTTPException:
+        return {"detail": "Logged out successfully"}
 
+    revoke_payload(db, token_data)
+    db.commit()
+    return {"detail": "Logged out successfully"}
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from functions.data_versions import bump_data_version, office_scope, user_scope
+from models.models import ACTIVE_ITEM_STATUSES, FoundItem, FoundItemArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "730"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_SLEEP_SECONDS = float(os.getenv("ARCHIVE_SLEEP_SECONDS", "0.5"))
+# during office hours batches shrink and pauses grow, so intake never queues behind the job
+ARCHIVE_OFFICE_HOURS = os.getenv("ARCHIVE_OFFICE_HOURS", "7-16")
+ARCHIVE_OFFICE_HOURS_BATCH_SIZE = int(os.getenv("ARCHIVE_OFFICE_HOURS_BATCH_SIZE", "100"))
+ARCHIVE_OFFICE_HOURS_SLEEP_SECONDS = float(os.getenv("ARCHIVE_OFFICE_HOURS_SLEEP_SECONDS", "5"))
+ARCHIVE_LOCK_TIMEOUT = os.getenv("ARCHIVE_LOCK_TIMEOUT", "2s")
+# consecutive lock timeouts after which a run gives up; the next run resumes
+ARCHIVE_MAX_LOCK_TIMEOUTS = int(os.getenv("ARCHIVE_MAX_LOCK_TIMEOUTS", "10"))
+
+# SQLSTATE lock_not_available, raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+found_items = FoundItem.__table__
+
+
+def _in_office_hours(now: Optional[datetime] = None) -> bool:
+    now = now or datetime.now()
+    if now.weekday() >= 5:
+        return False
+    start, end = (int(h) for h in ARCHIVE_OFFICE_HOURS.split("-"))
+    return start <= now.hour < end
+
+
+def _encode_payload(row: dict[str, Any]) -> bytes:
+    raw = json.dumps(row, default=str, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), 9)
+
+
+def decode_payload(payload: bytes) -> dict[str, Any]:
+    row = json.loads(zlib.decompress(payload).decode("utf-8"))
+    for key in ("found_date", "created_at", "status_changed_at"):
+        if row.get(key):
+            row[key] = datetime.fromisoformat(row[key])
+    for key in ("id", "county_office_id"):
+        if row.get(key):
+            row[key] = uuid.UUID(row[key])
+    return row
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    db.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {"timeout": ARCHIVE_LOCK_TIMEOUT})
+
+    rows = db.execute(
+        select(found_items)
+        # items still on a shelf or awaiting pickup stay, however old
+        .where(found_items.c.created_at < cutoff, found_items.c.status.notin_(ACTIVE_ITEM_STATUSES))
+        .order_by(found_items.c.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).mappings().all()
+
+    if not rows:
+        db.rollback()
+        return 0
+
+    archived_at = datetime.now(timezone.utc)
+    db.execute(
+        insert(FoundItemArchive)
+        .values([
+            {
+                "id": row["id"],
+                "registry_number": row["registry_number"],
+                "county_office_id": row["county_office_id"],
+                "user_id": row["user_id"],
+                "created_at": row["created_at"],
+                "archived_at": archived_at,
+                "payload": _encode_payload(dict(row)),
+            }
+            for row in rows
+        ])
+        .on_conflict_do_nothing(index_elements=[FoundItemArchive.id])
+    )
+
+    db.execute(
+        delete(found_items).where(
+            found_items.c.id.in_([row["id"] for row in rows]),
+            found_items.c.created_at < cutoff,
+        )
+    )
+
+    scopes = set()
+    for row in rows:
+        scopes.add(user_scope(row["user_id"]))
+        if row["county_office_id"]:
+            scopes.add(office_scope(row["county_office_id"]))
+    bump_data_version(db, *scopes)
+
+    db.commit()
+    return len(rows)
+
+
+def run_archival(
+    session_factory,
+    retention_days: int = ARCHIVE_RETENTION_DAYS,
+    max_batches: Optional[int] = None,
+) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    total = 0
+    batches = 0
+    lock_timeouts = 0
+
+    while max_batches is None or batches < max_batches:
+        busy = _in_office_hours()
+        batch_size = ARCHIVE_OFFICE_HOURS_BATCH_SIZE if busy else ARCHIVE_BATCH_SIZE
+        pause = ARCHIVE_OFFICE_HOURS_SLEEP_SECONDS if busy else ARCHIVE_SLEEP_SECONDS
+
+        batches += 1
+        db = session_factory()
+        try:
+            moved = archive_batch(db, cutoff, batch_size)
+        except OperationalError as e:
+            db.rollback()
+            # anything but lock_timeout (the database is down, say) ends the run
+            if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE:
+                raise
+            lock_timeouts += 1
+            if lock_timeouts >= ARCHIVE_MAX_LOCK_TIMEOUTS:
+                logger.warning("Archival gave up after %s lock timeouts in a row", lock_timeouts)
+                break
+            # someone is working on these rows, back off and retry
+            logger.warning("Archival batch timed out waiting for locks, backing off")
+            time.sleep(pause * 4)
+            continue
+        finally:
+            db.close()
+
+        lock_timeouts = 0
+        total += moved
+        logger.info("Archived %s found items (total %s)", moved, total)
+        if moved < batch_size:
+            break
+        time.sleep(pause)
+
+    return total
+
+
+def get_archived_item(db: Session, registry_number: str) -> Optional[tuple[FoundItemArchive, dict[str, Any]]]:
+    archived = (
+        db.query(FoundItemArchive)
+        .filter(FoundItemArchive.registry_number == registry_number)
+        .first()
+    )
+    if not archived:
+        return None
+    return archived, decode_payload(archived.payload)
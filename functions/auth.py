@@ -6,6 +6,9 @@ from fastapi import Request, HTTPException, status
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from config.logging_config import set_request_user
+from functions.token_revocation import new_token_id, revocation_filter
+
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
@@ -26,6 +29,7 @@ def create_access_token(
     expires_delta: Optional[timedelta] = None,
 ) -> str:
     to_encode = data.copy()
+    to_encode.setdefault("jti", new_token_id())
     if expires_delta is None:
         expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
@@ -65,11 +69,27 @@ def get_current_user_token(request: Request) -> dict[str, Any]:
             detail="Invalid authorization header",
         )
     
+    return validate_access_token(token)
+
+
+def validate_access_token(token: str) -> dict[str, Any]:
     try:
         payload = decode_access_token(token)
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
-        )
\ No newline at end of file
+        )
+
+    if payload.get("type") == "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+        )
+    if revocation_filter.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    set_request_user(payload.get("user_id"))
+    return payload
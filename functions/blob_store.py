@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from typing import Iterator, Optional
+
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "blob_store"))
+# "UseDevelopmentStorage=true" points the Azure backend at a local Azurite emulator
+AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING", "")
+AZURE_STORAGE_CONTAINER = os.getenv("AZURE_STORAGE_CONTAINER", "photos")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def put_file(self, key: str, path: str, content_type: str, cache_control: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def download_to(self, key: str, path: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.stat(self._path(key)).st_size
+
+    def put_file(self, key: str, path: str, content_type: str, cache_control: Optional[str] = None) -> None:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def download_to(self, key: str, path: str) -> None:
+        shutil.copyfile(self._path(key), path)
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+
+class AzureBlobStore(BlobStore):
+    def __init__(self, connection_string: str, container: str):
+        from azure.core.exceptions import ResourceExistsError
+        from azure.storage.blob import BlobServiceClient
+
+        service = BlobServiceClient.from_connection_string(connection_string)
+        self.container = service.get_container_client(container)
+        try:
+            self.container.create_container()
+        except ResourceExistsError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return self.container.get_blob_client(key).exists()
+
+    def size(self, key: str) -> int:
+        return self.container.get_blob_client(key).get_blob_properties().size
+
+    def put_file(self, key: str, path: str, content_type: str, cache_control: Optional[str] = None) -> None:
+        from azure.storage.blob import ContentSettings
+
+        with open(path, "rb") as f:
+            self.container.upload_blob(
+                name=key,
+                data=f,
+                overwrite=True,
+                content_settings=ContentSettings(content_type=content_type, cache_control=cache_control),
+            )
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        downloader = self.container.download_blob(key, offset=start, length=end - start + 1)
+        yield from downloader.chunks()
+
+    def download_to(self, key: str, path: str) -> None:
+        with open(path, "wb") as f:
+            self.container.download_blob(key).readinto(f)
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    if BLOB_STORE == "azure":
+        return AzureBlobStore(AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER)
+    return LocalBlobStore(BLOB_STORE_DIR)
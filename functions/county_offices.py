@@ -0,0 +1,202 @@
+import csv
+import os
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.config import SessionLocal
+from functions.data_versions import COUNTY_OFFICES_SCOPE, bump_data_version, get_data_version
+from models.models import CountyOffice, User, starostwo_users
+
+OFFICE_CACHE_CHECK_SECONDS = float(os.getenv("OFFICE_CACHE_CHECK_SECONDS", "30"))
+TERYT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class TerytUnit:
+    woj: str
+    pow: str
+    name: str
+    kind: str
+
+
+@dataclass(frozen=True)
+class OfficeInfo:
+    id: uuid.UUID
+    code: str
+    county_name: str
+    county_code: Optional[str]
+    voivodeship_name: Optional[str]
+    voivodeship_code: Optional[str]
+
+
+def _unit(row: dict) -> Optional[TerytUnit]:
+    row = {(k or "").strip().upper(): (v or "").strip() for k, v in row.items()}
+    woj = row.get("WOJ", "")
+    if not woj:
+        return None
+    return TerytUnit(
+        woj=woj.zfill(2),
+        pow=row.get("POW", "").zfill(2) if row.get("POW") else "",
+        name=row.get("NAZWA", ""),
+        kind=row.get("NAZWA_DOD", "").lower(),
+    )
+
+
+# TERC catalogue as published by GUS, either the CSV (semicolon separated) or
+# the XML export. Gminas are skipped: only voivodeship and powiat rows matter.
+def read_teryt(path: str) -> Iterator[TerytUnit]:
+    if path.lower().endswith(".xml"):
+        for _, element in ET.iterparse(path, events=("end",)):
+            if element.tag.lower() != "row":
+                continue
+            values = {child.tag: child.text for child in element}
+            element.clear()
+            if (values.get("GMI") or "").strip():
+                continue
+            unit = _unit(values)
+            if unit:
+                yield unit
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f, delimiter=";"):
+            if (row.get("GMI") or "").strip():
+                continue
+            unit = _unit(row)
+            if unit:
+                yield unit
+
+
+def office_name(unit: TerytUnit) -> str:
+    if "miasto" in unit.kind:
+        return f"Urząd Miasta {unit.name}"
+    return f"Starostwo Powiatowe – powiat {unit.name}"
+
+
+def office_rows(units: Iterable[TerytUnit]) -> list[dict]:
+    units = list(units)
+    voivodeships = {u.woj: u.name.lower() for u in units if not u.pow}
+    return [
+        {
+            "id": uuid.uuid4(),
+            "code": u.woj + u.pow,
+            "county_name": office_name(u),
+            "county_code": u.woj + u.pow,
+            "voivodeship_code": u.woj,
+            "voivodeship_name": voivodeships.get(u.woj),
+        }
+        for u in units
+        if u.pow
+    ]
+
+
+# Upsert on code in batches. Existing office names are kept unless asked:
+# they are often the proper "Starostwo Powiatowe w Bydgoszczy" form that
+# cannot be generated from the registry.
+def upsert_offices(db: Session, rows: list[dict], update_names: bool = False) -> int:
+    for start in range(0, len(rows), TERYT_BATCH_SIZE):
+        stmt = insert(CountyOffice).values(rows[start:start + TERYT_BATCH_SIZE])
+        update = {
+            "county_code": stmt.excluded.county_code,
+            "voivodeship_code": stmt.excluded.voivodeship_code,
+            "voivodeship_name": stmt.excluded.voivodeship_name,
+        }
+        if update_names:
+            update["county_name"] = stmt.excluded.county_name
+        db.execute(stmt.on_conflict_do_update(index_elements=[CountyOffice.code], set_=update))
+
+    bump_data_version(db, COUNTY_OFFICES_SCOPE)
+    db.commit()
+    office_directory.invalidate()
+    return len(rows)
+
+
+# (email, office code) pairs -> starostwo_users, three queries per batch in total.
+# Returns the pairs that could not be resolved.
+def assign_users(db: Session, pairs: list[tuple[str, str]], replace: bool = False) -> list[tuple[str, str]]:
+    emails = {email.strip().lower() for email, _ in pairs}
+    codes = {code.strip() for _, code in pairs}
+
+    users = dict(db.execute(select(func.lower(User.email), User.id).where(func.lower(User.email).in_(emails))).all())
+    offices = dict(db.execute(select(CountyOffice.code, CountyOffice.id).where(CountyOffice.code.in_(codes))).all())
+
+    links, missing = set(), []
+    for email, code in pairs:
+        user_id = users.get(email.strip().lower())
+        office_id = offices.get(code.strip())
+        if user_id is None or office_id is None:
+            missing.append((email, code))
+        else:
+            links.add((office_id, user_id))
+
+    if replace and links:
+        db.execute(delete(starostwo_users).where(starostwo_users.c.user_id.in_({u for _, u in links})))
+
+    links = sorted(links, key=lambda link: (str(link[0]), link[1]))
+    for start in range(0, len(links), TERYT_BATCH_SIZE):
+        db.execute(
+            insert(starostwo_users)
+            .values([{"county_office_id": o, "user_id": u} for o, u in links[start:start + TERYT_BATCH_SIZE]])
+            .on_conflict_do_nothing()
+        )
+    db.commit()
+    return missing
+
+
+class OfficeDirectory:
+    # All offices by code, shared by every request of the worker. Loaders bump
+    # the county_offices data version; workers compare it at most every
+    # OFFICE_CACHE_CHECK_SECONDS and reload when it moved.
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self._by_code: Optional[dict[str, OfficeInfo]] = None
+        self._version: Optional[int] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session) -> dict[str, OfficeInfo]:
+        version = get_data_version(db, COUNTY_OFFICES_SCOPE)
+        if self._by_code is not None and version == self._version:
+            return self._by_code
+        offices = db.execute(select(CountyOffice).order_by(CountyOffice.code)).scalars().all()
+        self._by_code = {
+            o.code: OfficeInfo(o.id, o.code, o.county_name, o.county_code, o.voivodeship_name, o.voivodeship_code)
+            for o in offices
+        }
+        self._version = version
+        return self._by_code
+
+    def _offices(self) -> dict[str, OfficeInfo]:
+        offices = self._by_code
+        if offices is None or time.monotonic() >= self._next_check:
+            with self._lock:
+                offices = self._by_code
+                if offices is None or time.monotonic() >= self._next_check:
+                    db = SessionLocal()
+                    try:
+                        offices = self._load(db)
+                    finally:
+                        db.close()
+                    self._next_check = time.monotonic() + self.check_seconds
+        return offices
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._by_code = None
+
+    def by_code(self, code: str) -> Optional[OfficeInfo]:
+        return self._offices().get(code.strip())
+
+    def all(self) -> list[OfficeInfo]:
+        return list(self._offices().values())
+
+
+office_directory = OfficeDirectory(OFFICE_CACHE_CHECK_SECONDS)
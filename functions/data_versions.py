@@ -0,0 +1,32 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.models import DataVersion
+
+COUNTY_OFFICES_SCOPE = "county_offices"
+
+
+def user_scope(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def office_scope(office_id) -> str:
+    return f"office:{office_id}"
+
+
+def bump_data_version(db: Session, *scopes: str) -> None:
+    scopes = [s for s in dict.fromkeys(scopes) if s]
+    if not scopes:
+        return
+
+    stmt = insert(DataVersion).values([{"scope": s, "version": 1} for s in sorted(scopes)])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={"version": DataVersion.version + 1},
+    )
+    db.execute(stmt)
+
+
+def get_data_version(db: Session, scope: str) -> int:
+    version = db.query(DataVersion.version).filter(DataVersion.scope == scope).scalar()
+    return version or 0
@@ -0,0 +1,119 @@
+import base64
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from models.models import FoundItem, FoundItemTombstone
+
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "90"))
+
+
+@dataclass(frozen=True)
+class SyncToken:
+    # changes with change_seq >= since are still to be sent; since == 0 is a full sync
+    since: int = 0
+    since_at: int = 0
+    # fixed at the first page of a pass, becomes the next since once it is done
+    horizon: Optional[int] = None
+    horizon_at: int = 0
+    # keyset position inside the pass
+    after: Optional[tuple[int, uuid.UUID]] = None
+
+
+def encode_sync_token(token: SyncToken) -> str:
+    after_seq, after_id = token.after if token.after else (None, None)
+    raw = json.dumps(
+        [token.since, token.since_at, token.horizon, token.horizon_at, after_seq, str(after_id) if after_id else None],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_sync_token(value: Optional[str]) -> SyncToken:
+    if not value:
+        return SyncToken()
+    try:
+        since, since_at, horizon, horizon_at, after_seq, after_id = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+        return SyncToken(
+            since=int(since),
+            since_at=int(since_at),
+            horizon=int(horizon) if horizon is not None else None,
+            horizon_at=int(horizon_at),
+            after=(int(after_seq), uuid.UUID(after_id)) if after_id else None,
+        )
+    except Exception:
+        raise HTTPException(400, detail="Invalid sync token")
+
+
+def snapshot_horizon(db: Session) -> int:
+    # every transaction below the snapshot xmin has finished, so nothing can
+    # still appear with a change_seq under it
+    return db.execute(text("SELECT txid_snapshot_xmin(txid_current_snapshot())")).scalar()
+
+
+# One page of the user's change feed: items written and items deleted since
+# the token, merged in (change_seq, id) order. A pass may repeat a change the
+# previous one already sent; clients apply changes as upserts.
+def sync_changes(
+    db: Session,
+    user_id: int,
+    token: SyncToken,
+    limit: int,
+) -> tuple[list[FoundItem], list[uuid.UUID], SyncToken, bool]:
+    if token.since and token.since_at < time.time() - SYNC_TOMBSTONE_RETENTION_DAYS * 86400:
+        # deletions older than that are gone: only a full sync is correct now
+        raise HTTPException(status.HTTP_410_GONE, detail="Sync token expired, start a full sync")
+
+    if token.horizon is None:
+        token = replace(token, horizon=snapshot_horizon(db), horizon_at=int(time.time()))
+
+    items = select(FoundItem).where(FoundItem.user_id == user_id, FoundItem.change_seq >= token.since)
+    tombstones = select(FoundItemTombstone).where(
+        FoundItemTombstone.user_id == user_id,
+        FoundItemTombstone.change_seq >= token.since,
+    )
+    if token.after:
+        items = items.where(tuple_(FoundItem.change_seq, FoundItem.id) > tuple_(*token.after))
+        tombstones = tombstones.where(
+            tuple_(FoundItemTombstone.change_seq, FoundItemTombstone.found_item_id) > tuple_(*token.after)
+        )
+
+    changed = db.execute(
+        items.order_by(FoundItem.change_seq, FoundItem.id).limit(limit + 1)
+    ).scalars().all()
+    removed = db.execute(
+        tombstones.order_by(FoundItemTombstone.change_seq, FoundItemTombstone.found_item_id).limit(limit + 1)
+    ).scalars().all()
+
+    merged = sorted(
+        [((i.change_seq, i.id), i) for i in changed] + [((t.change_seq, t.found_item_id), t) for t in removed],
+        key=lambda entry: entry[0],
+    )
+    page, has_more = merged[:limit], len(merged) > limit
+
+    if has_more:
+        next_token = replace(token, after=page[-1][0])
+    else:
+        next_token = SyncToken(since=token.horizon, since_at=token.horizon_at)
+
+    return (
+        [row for _, row in page if isinstance(row, FoundItem)],
+        [row.found_item_id for _, row in page if isinstance(row, FoundItemTombstone)],
+        next_token,
+        has_more,
+    )
+
+
+def purge_tombstones(db: Session, retention_days: int = SYNC_TOMBSTONE_RETENTION_DAYS) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    deleted = db.execute(delete(FoundItemTombstone).where(FoundItemTombstone.deleted_at < cutoff)).rowcount
+    db.commit()
+    return deleted
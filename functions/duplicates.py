@@ -0,0 +1,280 @@
+import hashlib
+import os
+import random
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from functions.data_versions import get_data_version, office_scope
+from functions.text_normalize import normalize
+from functions.vocabulary import display_value
+from models.models import FoundItem
+
+DUPLICATE_INDEX_DAYS = int(os.getenv("DUPLICATE_INDEX_DAYS", "14"))
+DUPLICATE_INDEX_MAX_ITEMS = int(os.getenv("DUPLICATE_INDEX_MAX_ITEMS", "5000"))
+DUPLICATE_SIMILARITY = float(os.getenv("DUPLICATE_SIMILARITY", "0.6"))
+DUPLICATE_DATE_WINDOW = timedelta(days=int(os.getenv("DUPLICATE_DATE_WINDOW_DAYS", "2")))
+DUPLICATE_MAX_RESULTS = 5
+# rows committed out of created_at order are picked up by re-reading a short overlap
+DUPLICATE_SYNC_OVERLAP = timedelta(seconds=60)
+
+# 16 bands of 2 rows: pairs above ~0.5 Jaccard almost always share a band,
+# the exact threshold is applied to the signatures afterwards
+MINHASH_BANDS = 16
+MINHASH_ROWS = 2
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+def shingles(name: Optional[str], brand: Optional[str], color: Optional[str]) -> set[str]:
+    result = set()
+    name = normalize(name)
+    padded = f" {name} "
+    result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    result.update("b:" + t for t in normalize(brand).split())
+    result.update("c:" + t for t in normalize(color).split())
+    result.discard("   ")
+    return result
+
+
+def minhash(tokens: set[str]) -> Optional[tuple[int, ...]]:
+    if not tokens:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") for t in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def _bands(signature: tuple[int, ...]):
+    for band in range(MINHASH_BANDS):
+        yield band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+
+
+def _location_matches(a: set[str], b: set[str]) -> bool:
+    if not a or not b:
+        return True
+    return len(a & b) / len(a | b) >= 0.5 or a <= b or b <= a
+
+
+@dataclass
+class IndexedItem:
+    id: uuid.UUID
+    registry_number: Optional[str]
+    item_name: str
+    item_brand: Optional[str]
+    item_color: Optional[str]
+    found_location: Optional[str]
+    found_date: Optional[datetime]
+    created_at: datetime
+    signature: tuple[int, ...]
+    location_tokens: frozenset
+
+
+@dataclass
+class DuplicateMatch:
+    item: IndexedItem
+    similarity: float
+
+
+class OfficeDuplicateIndex:
+    # MinHash/LSH over the office's recent intake. Kept in sync with other
+    # workers by re-reading rows newer than the last sync whenever the office
+    # data version moved, so a check normally costs one primary-key lookup.
+    def __init__(self):
+        self.items: dict[uuid.UUID, IndexedItem] = {}
+        self.buckets: dict[tuple, set[uuid.UUID]] = {}
+        self.version: Optional[int] = None
+        self.synced_until: Optional[datetime] = None
+        self.lock = threading.Lock()
+
+    def add(self, item: IndexedItem) -> None:
+        if item.id in self.items:
+            return
+        self.items[item.id] = item
+        for key in _bands(item.signature):
+            self.buckets.setdefault(key, set()).add(item.id)
+
+    def remove(self, item_id: uuid.UUID) -> None:
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        for key in _bands(item.signature):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def evict(self, cutoff: datetime) -> None:
+        for item_id in [i.id for i in self.items.values() if i.created_at < cutoff]:
+            self.remove(item_id)
+        overflow = len(self.items) - DUPLICATE_INDEX_MAX_ITEMS
+        if overflow > 0:
+            for item in sorted(self.items.values(), key=lambda i: i.created_at)[:overflow]:
+                self.remove(item.id)
+
+    def candidates(self, signature: tuple[int, ...]) -> set[uuid.UUID]:
+        found = set()
+        for key in _bands(signature):
+            found |= self.buckets.get(key, set())
+        return found
+
+
+def _naive(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is not None and dt.tzinfo is not None:
+        return dt.replace(tzinfo=None)
+    return dt
+
+
+def indexed_item(
+    item_id: uuid.UUID,
+    registry_number: Optional[str],
+    item_name: str,
+    item_brand: Optional[str],
+    item_color: Optional[str],
+    found_location: Optional[str],
+    found_date: Optional[datetime],
+    created_at: datetime,
+) -> Optional[IndexedItem]:
+    signature = minhash(shingles(item_name, item_brand, item_color))
+    if signature is None:
+        return None
+    return IndexedItem(
+        id=item_id,
+        registry_number=registry_number,
+        item_name=item_name,
+        item_brand=item_brand,
+        item_color=item_color,
+        found_location=found_location,
+        found_date=_naive(found_date),
+        created_at=_naive(created_at),
+        signature=signature,
+        location_tokens=frozenset(normalize(found_location).split()),
+    )
+
+
+class DuplicateDetector:
+    def __init__(self):
+        self._offices: dict[uuid.UUID, OfficeDuplicateIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, office_id: uuid.UUID) -> OfficeDuplicateIndex:
+        with self._lock:
+            index = self._offices.get(office_id)
+            if index is None:
+                index = self._offices[office_id] = OfficeDuplicateIndex()
+            return index
+
+    def _sync(self, db: Session, office_id: uuid.UUID, index: OfficeDuplicateIndex) -> None:
+        version = get_data_version(db, office_scope(office_id))
+        if version == index.version:
+            return
+
+        cutoff = datetime.utcnow() - timedelta(days=DUPLICATE_INDEX_DAYS)
+        since = cutoff if index.synced_until is None else max(cutoff, index.synced_until - DUPLICATE_SYNC_OVERLAP)
+        rows = db.execute(
+            select(
+                FoundItem.id,
+                FoundItem.registry_number,
+                FoundItem.item_name,
+                FoundItem.item_brand_id,
+                FoundItem.item_brand,
+                FoundItem.item_color_id,
+                FoundItem.item_color,
+                FoundItem.found_location,
+                FoundItem.found_date,
+                FoundItem.created_at,
+            )
+            .where(FoundItem.county_office_id == office_id, FoundItem.created_at >= since)
+            .order_by(FoundItem.created_at.desc())
+            .limit(DUPLICATE_INDEX_MAX_ITEMS)
+        ).all()
+
+        for row in rows:
+            entry = indexed_item(
+                row.id,
+                row.registry_number,
+                row.item_name,
+                display_value(row.item_brand_id, row.item_brand),
+                display_value(row.item_color_id, row.item_color),
+                row.found_location,
+                row.found_date,
+                row.created_at,
+            )
+            if entry is not None:
+                index.add(entry)
+            created_at = _naive(row.created_at)
+            if index.synced_until is None or created_at > index.synced_until:
+                index.synced_until = created_at
+
+        if index.synced_until is None:
+            index.synced_until = cutoff
+        index.evict(cutoff)
+        index.version = version
+
+    def find(
+        self,
+        db: Session,
+        office_id: uuid.UUID,
+        item_name: str,
+        item_brand: Optional[str],
+        item_color: Optional[str],
+        found_location: Optional[str],
+        found_date: Optional[datetime],
+    ) -> list[DuplicateMatch]:
+        signature = minhash(shingles(item_name, item_brand, item_color))
+        if signature is None:
+            return []
+        location_tokens = set(normalize(found_location).split())
+        found_date = _naive(found_date)
+
+        index = self._index(office_id)
+        with index.lock:
+            self._sync(db, office_id, index)
+
+            matches = []
+            for item_id in index.candidates(signature):
+                item = index.items[item_id]
+                if found_date and item.found_date and abs(found_date - item.found_date) > DUPLICATE_DATE_WINDOW:
+                    continue
+                if not _location_matches(location_tokens, item.location_tokens):
+                    continue
+                score = similarity(signature, item.signature)
+                if score >= DUPLICATE_SIMILARITY:
+                    matches.append(DuplicateMatch(item, score))
+
+        matches.sort(key=lambda m: (-m.similarity, m.item.created_at))
+        return matches[:DUPLICATE_MAX_RESULTS]
+
+    def remember(self, item: FoundItem) -> None:
+        if item.county_office_id is None:
+            return
+        entry = indexed_item(
+            item.id,
+            item.registry_number,
+            item.item_name,
+            display_value(item.item_brand_id, item.item_brand),
+            display_value(item.item_color_id, item.item_color),
+            item.found_location,
+            item.found_date,
+            item.created_at,
+        )
+        if entry is None:
+            return
+        index = self._index(item.county_office_id)
+        with index.lock:
+            index.add(entry)
+
+
+duplicate_detector = DuplicateDetector()
@@ -0,0 +1,148 @@
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "export_cache"))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# files hit this recently are never evicted, so a FileResponse that is still
+# streaming from another worker does not lose its file
+EVICTION_GRACE_SECONDS = 30
+
+
+class ExportCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.bytes_written = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(scope: str, fmt: str, filters: dict[str, Any], version: int) -> str:
+        raw = json.dumps(
+            [scope, fmt, {k: v for k, v in sorted(filters.items()) if v is not None}, version],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            size = os.stat(path).st_size
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_served += size
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self._path(key)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=shard, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            self.bytes_written += len(data)
+            if self._approx_bytes is not None:
+                self._approx_bytes += len(data)
+            needs_eviction = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+
+        if needs_eviction:
+            self.evict()
+        return path
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, st.st_size, st.st_mtime
+
+    def evict(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = os.path.join(self.directory, ".evict.lock")
+
+        with open(lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # another worker is already evicting
+                return
+
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            now = time.time()
+            evicted = 0
+
+            for path, size, mtime in entries:
+                if total <= target:
+                    break
+                if now - mtime < EVICTION_GRACE_SECONDS:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self._approx_bytes = total
+            self.evictions += evicted
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes_served": self.bytes_served,
+                "bytes_written": self.bytes_written,
+                "evictions": self.evictions,
+                "approx_bytes": self._approx_bytes,
+                "max_bytes": self.max_bytes,
+                "pid": os.getpid(),
+            }
+
+
+export_cache = ExportCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
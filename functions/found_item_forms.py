@@ -1,15 +1,46 @@
-from typing import List
+from typing import List, Optional
 from io import BytesIO
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, time
+from types import SimpleNamespace
+import os
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import String, any_, cast, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session, lazyload, selectinload
 from models.models import RegistryCounter, CountyOffice
-from context.db import get_db
+from config.config import engine
+from context.db import get_db, get_read_db, pin_to_primary
+from functions.archive import get_archived_item
 from functions.auth import get_current_user_token
-from models.models import FoundItem, User
-from schemas.found_item_form import FoundItemFormRequest, FoundItemFormResponse
+from functions.data_versions import bump_data_version, get_data_version, office_scope, user_scope
+from functions.delta_sync import decode_sync_token, encode_sync_token, sync_changes
+from functions.duplicates import DuplicateMatch, duplicate_detector
+from functions.export_cache import export_cache
+from functions.geocoding import geocode_location
+from functions.live_feed import publish_item_event
+from functions.partitions import ensure_found_item_partitions
+from functions.pii_audit import FINDER_PII_FIELDS, audit_pii_access, pii_audit
+from functions.rate_limit import rate_limit
+from functions.receipts import receipt_data, receipt_pdf_path, schedule_receipt
+from functions.vocabulary import display_value, match_brand, match_color
+from functions.idempotency import claim_idempotency_key, request_fingerprint, store_idempotent_response
+from functions.item_status import change_item_status, record_status_change, status_history
+from models.models import FoundItem, User, starostwo_users
+from schemas.found_item_form import (
+    DuplicateCandidateResponse,
+    FoundItemBatchEntry,
+    FoundItemBatchRequest,
+    FoundItemBatchResponse,
+    FoundItemFormRequest,
+    FoundItemFormResponse,
+    FoundItemSyncPage,
+)
+from schemas.found_item_receipt import ReceiptBatchRequest
+from schemas.found_item_status import FoundItemStatusChangeResponse, FoundItemStatusRequest
 
 try:
     import openpyxl
@@ -22,6 +53,9 @@ except ImportError:
 
 router = APIRouter(prefix="/found-item-forms", tags=["found-item-forms"])
 
+# accounts allowed to see operational stats; empty means nobody
+OPERATOR_EMAILS = {e.strip().lower() for e in os.getenv("OPERATOR_EMAILS", "").split(",") if e.strip()}
+
 
 def _naive(dt):
     if dt and getattr(dt, "tzinfo", None):
@@ -66,7 +100,83 @@ def require_user(
     return user
 
 
-def to_form_response(i: FoundItem) -> FoundItemFormResponse:
+def require_read_user(
+    token_data: dict = Depends(get_current_user_token),
+    db: Session = Depends(get_read_db),
+) -> User:
+    return require_user(token_data, db)
+
+
+def require_operator(
+    current_user: User = Depends(require_read_user),
+) -> User:
+    if current_user.email.lower() not in OPERATOR_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operators only")
+    return current_user
+
+
+def get_accessible_item(db: Session, user: User, item_id: str, for_update: bool = False) -> FoundItem:
+    try:
+        item_uuid = uuid.UUID(item_id)
+    except ValueError:
+        raise HTTPException(400, detail="Invalid item_id")
+
+    office_ids = [o.id for o in user.county_offices]
+    query = db.query(FoundItem).filter(
+        FoundItem.id == item_uuid,
+        or_(FoundItem.user_id == user.id, FoundItem.county_office_id.in_(office_ids)),
+    )
+    if for_update:
+        query = query.options(lazyload(FoundItem.county_office)).with_for_update()
+    item = query.first()
+    if not item:
+        raise HTTPException(404, detail="Form not found")
+    return item
+
+
+def _any(column, values: list, item_type):
+    # one array parameter instead of one per value: same SQL text for every batch size
+    return column == any_(cast(literal(values, ARRAY(item_type)), ARRAY(item_type)))
+
+
+# Items for a mixed list of ids and registry numbers in one query, with the
+# same access rule as get_accessible_item evaluated by the database. Returns one
+# entry per key, in order; None where the item is missing or not accessible.
+def lookup_accessible_items(db: Session, user: User, keys: List[str], *options) -> List[Optional[FoundItem]]:
+    parsed, ids, numbers = [], set(), set()
+    for key in keys:
+        key = key.strip()
+        try:
+            parsed.append((True, uuid.UUID(key)))
+            ids.add(parsed[-1][1])
+        except ValueError:
+            parsed.append((False, key.upper()))
+            numbers.add(key.upper())
+
+    matches = []
+    if ids:
+        matches.append(_any(FoundItem.id, sorted(ids), UUID(as_uuid=True)))
+    if numbers:
+        matches.append(_any(FoundItem.registry_number, sorted(numbers), String))
+
+    office_ids = select(starostwo_users.c.county_office_id).where(starostwo_users.c.user_id == user.id)
+    items = (
+        db.query(FoundItem)
+        .options(*options)
+        .filter(
+            or_(*matches),
+            or_(FoundItem.user_id == user.id, FoundItem.county_office_id.in_(office_ids)),
+        )
+        .all()
+    )
+
+    by_id = {i.id: i for i in items}
+    by_number = {i.registry_number: i for i in items}
+    return [(by_id if is_id else by_number).get(value) for is_id, value in parsed]
+
+
+def to_form_response(i: FoundItem, pii_action: str = "read") -> FoundItemFormResponse:
+    audit_pii_access([i], pii_action)
     created_at = getattr(i, "created_at", None)
     if not created_at:
         from datetime import timezone
@@ -78,8 +188,8 @@ def to_form_response(i: FoundItem) -> FoundItemFormResponse:
         id=str(getattr(i, "id")),
         registry_number=getattr(i, "registry_number", None),
         item_name=getattr(i, "item_name", "") or getattr(i, "name", "") or "",
-        item_color=getattr(i, "item_color", None),
-        item_brand=getattr(i, "item_brand", None),
+        item_color=display_value(getattr(i, "item_color_id", None), getattr(i, "item_color", None)),
+        item_brand=display_value(getattr(i, "item_brand_id", None), getattr(i, "item_brand", None)),
         found_location=getattr(i, "found_location", None),
         found_date=found_date,
         found_time=getattr(i, "found_time", None),
@@ -88,6 +198,24 @@ def to_form_response(i: FoundItem) -> FoundItemFormResponse:
         found_by_lastname=getattr(i, "found_by_lastname", None),
         found_by_phonenumber=getattr(i, "found_by_phonenumber", None),
         created_at=created_at,
+        status=getattr(i, "status", None),
+        status_changed_at=getattr(i, "status_changed_at", None),
+        found_lat=getattr(i, "found_lat", None),
+        found_lon=getattr(i, "found_lon", None),
+    )
+
+
+def to_duplicate_response(match: DuplicateMatch) -> DuplicateCandidateResponse:
+    item = match.item
+    return DuplicateCandidateResponse(
+        id=str(item.id),
+        registry_number=item.registry_number,
+        item_name=item.item_name,
+        item_color=item.item_color,
+        item_brand=item.item_brand,
+        found_location=item.found_location,
+        found_date=item.found_date,
+        similarity=round(match.similarity, 2),
     )
 
 
@@ -99,11 +227,18 @@ def _fmt_found(dt):
     except Exception:
         return str(dt)
 
-@router.post("/", response_model=FoundItemFormResponse, status_code=201)
+@router.post(
+    "/",
+    response_model=FoundItemFormResponse,
+    status_code=201,
+    dependencies=[Depends(rate_limit("found_items.create"))],
+)
 def add_found_item(
     payload: FoundItemFormRequest,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     if not hasattr(FoundItem, "county_office_id") or not hasattr(FoundItem, "registry_number"):
         raise HTTPException(500, detail="Model FoundItem missing county_office_id/registry_number fields")
@@ -116,11 +251,25 @@ def add_found_item(
     if not office:
         raise HTTPException(400, detail="User has no county office assigned")
 
+    if idempotency_key:
+        fingerprint = request_fingerprint("found-item-forms:create", payload)
+        try:
+            stored = claim_idempotency_key(db, current_user.id, idempotency_key, fingerprint)
+        except HTTPException:
+            db.rollback()
+            raise
+        if stored is not None:
+            db.rollback()
+            # the stored body carries the finder's data again
+            if isinstance(stored.response_body, dict) and stored.response_body.get("id"):
+                audit_pii_access([SimpleNamespace(**stored.response_body)], "read")
+            return JSONResponse(status_code=stored.status_code, content=stored.response_body)
+
     item = FoundItem()
 
     item.item_name = payload.item_name.strip()
-    item.item_color = payload.item_color.strip() if payload.item_color else None
-    item.item_brand = payload.item_brand.strip() if payload.item_brand else None
+    item.item_color_id, item.item_color = match_color(payload.item_color)
+    item.item_brand_id, item.item_brand = match_brand(payload.item_brand)
     item.found_location = payload.found_location.strip() if payload.found_location else None
 
     if payload.found_time:
@@ -141,6 +290,34 @@ def add_found_item(
     item.user_id = current_user.id
 
     item.county_office_id = office.id
+    item.status = "registered"
+
+    coordinates = geocode_location(item.found_location, office.county_code)
+    if coordinates:
+        item.found_lat, item.found_lon = coordinates
+
+    # before a registry number is allocated: a rejected duplicate must not burn one
+    if not payload.confirm_duplicate:
+        duplicates = duplicate_detector.find(
+            db,
+            office.id,
+            item.item_name,
+            display_value(item.item_brand_id, item.item_brand),
+            display_value(item.item_color_id, item.item_color),
+            item.found_location,
+            item.found_date,
+        )
+        if duplicates:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "Possible duplicate of a recently registered item, resend with confirm_duplicate to register anyway",
+                    "duplicates": jsonable_encoder([to_duplicate_response(m) for m in duplicates]),
+                },
+            )
+
+    ensure_found_item_partitions(engine)
 
     try:
         item.registry_number = next_registry_number(db, office)
@@ -149,16 +326,34 @@ def add_found_item(
         raise HTTPException(500, detail=f"Failed to generate registry number: {e}")
 
     db.add(item)
+    bump_data_version(db, user_scope(current_user.id), office_scope(office.id))
+    db.flush()
+    record_status_change(db, item, None, current_user.id)
+    publish_item_event(db, item, "created")
+
+    if idempotency_key:
+        db.refresh(item)
+        form_response = to_form_response(item)
+        store_idempotent_response(db, current_user.id, idempotency_key, 201, jsonable_encoder(form_response))
+        db.commit()
+        duplicate_detector.remember(item)
+        schedule_receipt(item)
+        pin_to_primary(response, current_user.id)
+        return form_response
+
     db.commit()
     db.refresh(item)
+    duplicate_detector.remember(item)
+    schedule_receipt(item)
+    pin_to_primary(response, current_user.id)
 
     return to_form_response(item)
 
 
 @router.get("/my", response_model=List[FoundItemFormResponse])
 def list_my_found_items(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
 ):
     if not hasattr(FoundItem, "user_id"):
         raise HTTPException(500, detail="Model FoundItem missing user_id field")
@@ -173,98 +368,95 @@ def list_my_found_items(
     return [to_form_response(i) for i in items]
 
 
-@router.get("/export")
-def export_my_forms(
-    format: str = Query("xlsx", pattern="^(xlsx|excel|json|csv)$"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+# Delta feed behind /my for offline clients: start without a token, keep the
+# last next_token and follow it while has_more is set.
+@router.get("/sync", response_model=FoundItemSyncPage, response_model_exclude_none=True)
+def sync_my_found_items(
+    token: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
 ):
-    order_col = getattr(FoundItem, "created_at", None) or getattr(FoundItem, "id")
-    items = (
-        db.query(FoundItem)
-        .filter(FoundItem.user_id == current_user.id)
-        .order_by(order_col.desc())
-        .all()
+    changed, deleted, next_token, has_more = sync_changes(db, current_user.id, decode_sync_token(token), limit)
+    return FoundItemSyncPage(
+        changed=[to_form_response(i) for i in changed],
+        deleted=[str(i) for i in deleted],
+        next_token=encode_sync_token(next_token),
+        has_more=has_more,
+    )
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _render_csv(mapped: List[FoundItemFormResponse]) -> bytes:
+    import csv
+    from io import StringIO
+
+    def _fmt_dt(dt):
+        if not dt:
+            return ""
+        try:
+            return dt.replace(microsecond=0).isoformat()
+        except Exception:
+            return str(dt)
+
+    output = StringIO()
+    writer = csv.writer(
+        output,
+        delimiter=";",
+        quoting=csv.QUOTE_MINIMAL,
     )
-    mapped = [to_form_response(i) for i in items]
-
-    if format == "csv":
-        import csv
-        from io import StringIO
-
-        def _fmt_dt(dt):
-            if not dt:
-                return ""
-            try:
-                return dt.replace(microsecond=0).isoformat()
-            except Exception:
-                return str(dt)
-
-        output = StringIO()
-        writer = csv.writer(
-            output,
-            delimiter=";",
-            quoting=csv.QUOTE_MINIMAL,
-        )
 
+    writer.writerow([
+        "ID",
+        "Numer ewidencyjny",
+        "Nazwa",
+        "Lokalizacja",
+        "Data znalezienia",
+        "Utworzono",
+    ])
+
+    for m in mapped:
         writer.writerow([
-            "ID",
-            "Numer ewidencyjny",
-            "Nazwa",
-            "Lokalizacja",
-            "Data znalezienia",
-            "Utworzono",
+            m.id,
+            getattr(m, "registry_number", None) or "",
+            m.item_name,
+            m.found_location or "",
+            _fmt_found(m.found_date),
+            _fmt_dt(m.created_at),
         ])
 
-        for m in mapped:
-            writer.writerow([
-                m.id,
-                getattr(m, "registry_number", None) or "",
-                m.item_name,
-                m.found_location or "",
-                _fmt_found(m.found_date),
-                _fmt_dt(m.created_at),
-            ])
-
-        csv_text = output.getvalue()
-        output.close()
-
-        csv_bytes = ("\ufeff" + csv_text).encode("utf-8")
-
-        headers = {"Content-Disposition": "attachment; filename=found_items.csv"}
-        return StreamingResponse(
-            BytesIO(csv_bytes),
-            media_type="text/csv; charset=utf-8",
-            headers=headers,
-        )
+    csv_text = output.getvalue()
+    output.close()
 
-    elif format == "json":
-        import json
-
-        data = []
-        for m in mapped:
-            data.append({
-                "id": m.id,
-                "registry_number": getattr(m, "registry_number", None),
-                "item_name": m.item_name,
-                "item_color": m.item_color,
-                "item_brand": m.item_brand,
-                "found_location": m.found_location,
-                "found_date": m.found_date.isoformat() if m.found_date else None,
-                "created_at": m.created_at.isoformat() if m.created_at else None,
-            })
-
-        buf = BytesIO(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
-        headers = {"Content-Disposition": "attachment; filename=found_items.json"}
-        return StreamingResponse(
-            buf,
-            media_type="application/json",
-            headers=headers,
-        )
+    return ("\ufeff" + csv_text).encode("utf-8")
 
-    if openpyxl is None:
-        raise HTTPException(500, detail="openpyxl not installed. Add it to requirements.")
 
+def _render_json(mapped: List[FoundItemFormResponse]) -> bytes:
+    import json
+
+    data = []
+    for m in mapped:
+        data.append({
+            "id": m.id,
+            "registry_number": getattr(m, "registry_number", None),
+            "item_name": m.item_name,
+            "item_color": m.item_color,
+            "item_brand": m.item_brand,
+            "found_location": m.found_location,
+            "found_date": m.found_date.isoformat() if m.found_date else None,
+            "created_at": m.created_at.isoformat() if m.created_at else None,
+        })
+
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _render_xlsx(mapped: List[FoundItemFormResponse]) -> bytes:
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Found items"
@@ -347,21 +539,127 @@ def export_my_forms(
 
     stream = BytesIO()
     wb.save(stream)
-    stream.seek(0)
+    return stream.getvalue()
+
+
+EXPORT_RENDERERS = {
+    "csv": _render_csv,
+    "json": _render_json,
+    "xlsx": _render_xlsx,
+}
+
+
+def _created_at_range(year: int | None, month: int | None):
+    if year is None:
+        if month is not None:
+            raise HTTPException(400, detail="month filter requires year")
+        return None, None
+    if month is None:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    if month == 12:
+        return datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    return datetime(year, month, 1), datetime(year, month + 1, 1)
+
+
+@router.get("/export", dependencies=[Depends(rate_limit("found_items.export"))])
+def export_my_forms(
+    format: str = Query("xlsx", pattern="^(xlsx|excel|json|csv)$"),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    fmt = "xlsx" if format == "excel" else format
+    if fmt == "xlsx" and openpyxl is None:
+        raise HTTPException(500, detail="openpyxl not installed. Add it to requirements.")
 
-    headers = {"Content-Disposition": "attachment; filename=found_items.xlsx"}
-    return StreamingResponse(
-        stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    created_from, created_to = _created_at_range(year, month)
+
+    # read the version before the data: an insert racing with this export can
+    # only make the cached file newer than its key, never older
+    scope = user_scope(current_user.id)
+    version = get_data_version(db, scope)
+    cache_key = export_cache.make_key(scope, fmt, {"year": year, "month": month}, version)
+
+    filename = f"found_items.{fmt}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+
+    query = db.query(FoundItem).filter(FoundItem.user_id == current_user.id)
+    if created_from is not None:
+        query = query.filter(FoundItem.created_at >= created_from, FoundItem.created_at < created_to)
+
+    cached_path = export_cache.get(cache_key)
+    if cached_path:
+        # the file is handed out again, so is the finder data in it
+        pii_ids = query.filter(
+            or_(*(getattr(FoundItem, f).isnot(None) for f in FINDER_PII_FIELDS))
+        ).with_entities(FoundItem.id).all()
+        pii_audit.record((row.id for row in pii_ids), "export")
+        return FileResponse(
+            cached_path,
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers=headers,
+        )
+
+    order_col = getattr(FoundItem, "created_at", None) or getattr(FoundItem, "id")
+    items = query.order_by(order_col.desc()).all()
+    mapped = [to_form_response(i, pii_action="export") for i in items]
+
+    content = EXPORT_RENDERERS[fmt](mapped)
+    export_cache.put(cache_key, content)
+
+    return Response(
+        content=content,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
         headers=headers,
     )
 
 
+@router.get("/export/cache-stats")
+def export_cache_stats(
+    current_user: User = Depends(require_operator),
+):
+    return export_cache.stats()
+
+
+@router.post("/batch", response_model=FoundItemBatchResponse)
+def get_found_items_batch(
+    payload: FoundItemBatchRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    items = lookup_accessible_items(db, current_user, payload.keys)
+    return FoundItemBatchResponse(
+        results=[
+            FoundItemBatchEntry(key=key, found=item is not None, item=to_form_response(item) if item else None)
+            for key, item in zip(payload.keys, items)
+        ]
+    )
+
+
+@router.get("/archive/{registry_number}", response_model=FoundItemFormResponse)
+def get_archived_found_item(
+    registry_number: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    found = get_archived_item(db, registry_number.strip().upper())
+    if not found:
+        raise HTTPException(404, detail="Archived item not found")
+
+    archived, row = found
+    office_ids = {o.id for o in current_user.county_offices}
+    if archived.user_id != current_user.id and archived.county_office_id not in office_ids:
+        raise HTTPException(404, detail="Archived item not found")
+
+    return to_form_response(SimpleNamespace(**row))
+
+
 @router.get("/{item_id}", response_model=FoundItemFormResponse)
 def get_found_item(
     item_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
 ):
     try:
         item_uuid = uuid.UUID(item_id)
@@ -375,4 +673,78 @@ def get_found_item(
     )
     if not item:
         raise HTTPException(404, detail="Form not found")
-    return to_form_response(item)
\ No newline at end of file
+    return to_form_response(item)
+
+
+@router.post("/{item_id}/status", response_model=FoundItemFormResponse)
+def change_found_item_status(
+    item_id: str,
+    payload: FoundItemStatusRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    item = get_accessible_item(db, current_user, item_id, for_update=True)
+    change_item_status(db, item, payload.status, current_user.id, payload.note.strip() if payload.note else None)
+
+    bump_data_version(db, user_scope(item.user_id), office_scope(item.county_office_id) if item.county_office_id else None)
+    db.flush()
+    publish_item_event(db, item, "status_changed")
+
+    db.commit()
+    db.refresh(item)
+    pin_to_primary(response, current_user.id)
+
+    return to_form_response(item)
+
+
+@router.get("/{item_id}/status-history", response_model=List[FoundItemStatusChangeResponse])
+def get_found_item_status_history(
+    item_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    item = get_accessible_item(db, current_user, item_id)
+    return [FoundItemStatusChangeResponse.model_validate(c) for c in status_history(db, item)]
+
+
+def _receipt_response(receipts, filename: str) -> FileResponse:
+    try:
+        path = receipt_pdf_path(receipts)
+    except FutureTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Receipt is still rendering, retry shortly",
+            headers={"Retry-After": "2"},
+        )
+    return FileResponse(path, media_type="application/pdf", headers={"Content-Disposition": f"inline; filename={filename}"})
+
+
+@router.get("/{item_id}/receipt")
+def get_found_item_receipt(
+    item_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    item = get_accessible_item(db, current_user, item_id)
+    audit_pii_access([item], "receipt")
+    return _receipt_response([receipt_data(item)], f"potwierdzenie-{item.registry_number}.pdf")
+
+
+@router.post("/receipts", dependencies=[Depends(rate_limit("found_items.receipts"))])
+def get_found_item_receipts(
+    payload: ReceiptBatchRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    numbers = list(dict.fromkeys(payload.registry_numbers))
+    items = lookup_accessible_items(
+        db, current_user, numbers, selectinload(FoundItem.user), selectinload(FoundItem.county_office)
+    )
+    missing = [n for n, item in zip(numbers, items) if item is None]
+    if missing:
+        raise HTTPException(404, detail={"message": "Forms not found", "missing": missing})
+
+    audit_pii_access(items, "receipt")
+    # pages follow the order the clerk asked for
+    return _receipt_response([receipt_data(item) for item in items], "potwierdzenia.pdf")
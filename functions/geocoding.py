@@ -0,0 +1,134 @@
+import csv
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from functions.text_normalize import normalize
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CSV/TSV with a header: name, lat, lon and optionally county_code (TERYT powiat,
+# e.g. an extract of the PRNG place-name register). No network lookups at all.
+# Not shipped with the code: data/README.md says how to build it. A relative
+# path is taken from the repository root, not the working directory.
+GAZETTEER_PATH = os.path.join(ROOT, os.getenv("GAZETTEER_PATH", os.path.join("data", "gazetteer.csv")))
+GAZETTEER_MAX_WORDS = 5
+
+EARTH_RADIUS_M = 6371008.8
+
+_COORDINATES = re.compile(r"(-?\d{1,2}\.\d+)\s*[,; ]\s*(-?\d{1,3}\.\d+)")
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    lat: float
+    lon: float
+    county_code: Optional[str] = None
+
+
+class Gazetteer:
+    def __init__(self, path: str):
+        self.path = path
+        self._places: Optional[dict[str, list[Place]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, list[Place]]:
+        places: dict[str, list[Place]] = {}
+        if not os.path.exists(self.path):
+            logger.error(
+                "Gazetteer %s not found: found items get no coordinates and the map searches stay empty. "
+                "See data/README.md",
+                self.path,
+            )
+            return places
+
+        with open(self.path, newline="", encoding="utf-8-sig") as f:
+            try:
+                dialect = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+            for row in csv.DictReader(f, dialect=dialect):
+                try:
+                    place = Place(
+                        name=row["name"].strip(),
+                        lat=float(row["lat"]),
+                        lon=float(row["lon"]),
+                        county_code=(row.get("county_code") or "").strip() or None,
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                key = normalize(place.name)
+                if key and len(key.split()) <= GAZETTEER_MAX_WORDS:
+                    places.setdefault(key, []).append(place)
+
+        logger.info("Loaded %d gazetteer names from %s", len(places), self.path)
+        return places
+
+    @property
+    def places(self) -> dict[str, list[Place]]:
+        if self._places is None:
+            with self._lock:
+                if self._places is None:
+                    self._places = self._load()
+        return self._places
+
+    def reload(self) -> None:
+        places = self._load()
+        self._places = places
+
+    # The longest gazetteer name found in the text wins ("Dworzec Główny" beats
+    # "Główny"); among equal names, the one in the office's own county.
+    def geocode(self, text: Optional[str], county_code: Optional[str] = None) -> Optional[tuple[float, float]]:
+        if not text:
+            return None
+
+        match = _COORDINATES.search(text)
+        if match:
+            lat, lon = float(match.group(1)), float(match.group(2))
+            if -90 <= lat <= 90 and -180 <= lon <= 180:
+                return lat, lon
+
+        places = self.places
+        if not places:
+            return None
+
+        words = normalize(text).split()
+        for size in range(min(GAZETTEER_MAX_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                candidates = places.get(" ".join(words[start:start + size]))
+                if not candidates:
+                    continue
+                if county_code:
+                    local = [p for p in candidates if p.county_code and p.county_code.startswith(county_code)]
+                    candidates = local or candidates
+                place = candidates[0]
+                return place.lat, place.lon
+        return None
+
+
+gazetteer = Gazetteer(GAZETTEER_PATH)
+
+
+def geocode_location(text: Optional[str], county_code: Optional[str] = None) -> Optional[tuple[float, float]]:
+    return gazetteer.geocode(text, county_code)
+
+
+def bounding_box(lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = math.degrees(radius_m / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
@@ -0,0 +1,109 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24")))
+
+
+def request_fingerprint(endpoint: str, payload: BaseModel) -> str:
+    raw = endpoint + "\n" + payload.model_dump_json()
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Returns None when the caller now owns the key, otherwise the stored row to replay.
+# The claim is an uncommitted row in the caller's transaction, so a concurrent
+# request with the same key blocks on the primary key until the first one commits
+# (and is then replayed) or rolls back (and the waiter takes over).
+def claim_idempotency_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    fingerprint: str,
+) -> Optional[IdempotencyKey]:
+    now = datetime.now(timezone.utc)
+
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        created_at=now,
+        expires_at=now + IDEMPOTENCY_KEY_TTL,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "fingerprint": stmt.excluded.fingerprint,
+            "status_code": None,
+            "response_body": None,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at < now,
+    ).returning(IdempotencyKey.key)
+
+    if db.execute(stmt).first() is not None:
+        return None
+
+    stored = db.execute(
+        select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+        )
+    ).scalar_one()
+
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request",
+        )
+    if stored.status_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+        )
+    return stored
+
+
+def store_idempotent_response(
+    db: Session,
+    user_id: int,
+    key: str,
+    status_code: int,
+    body: Any,
+) -> None:
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+    ).update(
+        {"status_code": status_code, "response_body": body},
+        synchronize_session=False,
+    )
+
+
+def purge_expired_idempotency_keys(db: Session, batch_size: int = 5000) -> int:
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        expired = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < now)
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(IdempotencyKey).where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired)
+            )
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
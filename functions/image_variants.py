@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+from functions.blob_store import get_blob_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# kept free of database imports: this module is what the worker processes load
+PHOTO_VARIANTS = {
+    "thumb": 256,
+    "medium": 1024,
+}
+PHOTO_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def original_key(content_hash: str) -> str:
+    return f"originals/{content_hash[:2]}/{content_hash}"
+
+
+def variant_key(content_hash: str, variant: str) -> str:
+    return f"variants/{variant}/{content_hash[:2]}/{content_hash}.jpg"
+
+
+def render_variants(content_hash: str) -> tuple[int, int]:
+    if Image is None:
+        raise RuntimeError("Pillow not installed. Add it to requirements.")
+
+    store = get_blob_store()
+    src_key = original_key(content_hash)
+    src_path = store.local_path(src_key)
+    downloaded = None
+    if src_path is None:
+        fd, downloaded = tempfile.mkstemp(prefix="photo-src-")
+        os.close(fd)
+        store.download_to(src_key, downloaded)
+        src_path = downloaded
+
+    try:
+        with Image.open(src_path) as im:
+            width, height = im.size
+            if im.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                width, height = height, width
+
+            # let the JPEG decoder downscale while decoding instead of after
+            largest = max(PHOTO_VARIANTS.values())
+            im.draft("RGB", (largest, largest))
+            im = ImageOps.exif_transpose(im)
+
+            for variant, max_side in sorted(PHOTO_VARIANTS.items(), key=lambda v: -v[1]):
+                im.thumbnail((max_side, max_side))
+                fd, out_path = tempfile.mkstemp(prefix=f"photo-{variant}-", suffix=".jpg")
+                os.close(fd)
+                try:
+                    im.convert("RGB").save(out_path, "JPEG", quality=82, optimize=True, progressive=True)
+                    store.put_file(variant_key(content_hash, variant), out_path, "image/jpeg", PHOTO_CACHE_CONTROL)
+                finally:
+                    os.unlink(out_path)
+    finally:
+        if downloaded:
+            os.unlink(downloaded)
+
+    return width, height
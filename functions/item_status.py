@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from models.models import ITEM_STATUSES, FoundItem, FoundItemStatusChange
+
+# registered -> stored -> claimed -> returned; an item can leave the shelf
+# (transferred / disposed) from any active state, and a claim can fall through
+ITEM_STATUS_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    "registered": ("stored", "claimed", "transferred", "disposed"),
+    "stored": ("claimed", "transferred", "disposed"),
+    "claimed": ("returned", "stored"),
+    "returned": (),
+    "transferred": (),
+    "disposed": (),
+}
+
+
+def record_status_change(
+    db: Session,
+    item: FoundItem,
+    from_status: Optional[str],
+    changed_by: Optional[int],
+    note: Optional[str] = None,
+    changed_at: Optional[datetime] = None,
+) -> FoundItemStatusChange:
+    change = FoundItemStatusChange(
+        found_item_id=item.id,
+        from_status=from_status,
+        to_status=item.status,
+        changed_by=changed_by,
+        changed_at=changed_at or datetime.now(timezone.utc),
+        note=note,
+    )
+    db.add(change)
+    return change
+
+
+# caller holds the row lock (get_accessible_item(..., for_update=True)),
+# so two concurrent transitions cannot both start from the same state
+def change_item_status(
+    db: Session,
+    item: FoundItem,
+    to_status: str,
+    changed_by: Optional[int],
+    note: Optional[str] = None,
+) -> FoundItemStatusChange:
+    if to_status not in ITEM_STATUSES:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown status '{to_status}'")
+
+    from_status = item.status or "registered"
+    if to_status not in ITEM_STATUS_TRANSITIONS.get(from_status, ()):
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            detail=f"Cannot change status from '{from_status}' to '{to_status}'",
+        )
+
+    changed_at = datetime.now(timezone.utc)
+    item.status = to_status
+    item.status_changed_at = changed_at
+    return record_status_change(db, item, from_status, changed_by, note, changed_at)
+
+
+def status_history(db: Session, item: FoundItem) -> list[FoundItemStatusChange]:
+    return (
+        db.query(FoundItemStatusChange)
+        .filter(FoundItemStatusChange.found_item_id == item.id)
+        .order_by(FoundItemStatusChange.changed_at, FoundItemStatusChange.id)
+        .all()
+    )
@@ -0,0 +1,332 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from config.config import SessionLocal, engine
+from functions.auth import validate_access_token
+from models.models import FoundItem, starostwo_users
+
+logger = logging.getLogger(__name__)
+
+LIVE_FEED_BROKER = os.getenv("LIVE_FEED_BROKER", "postgres")
+LIVE_FEED_CHANNEL = "found_item_events"
+LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "256"))
+LIVE_FEED_BUFFER_SIZE = int(os.getenv("LIVE_FEED_BUFFER_SIZE", "1000"))
+LIVE_FEED_HEARTBEAT_SECONDS = float(os.getenv("LIVE_FEED_HEARTBEAT_SECONDS", "15"))
+
+RESET = object()
+
+router = APIRouter(prefix="/offices", tags=["live-feed"])
+
+
+def item_event(item: FoundItem, op: str) -> dict[str, Any]:
+    # no finder personal data: the feed goes to every dashboard of the office
+    return {
+        "op": op,
+        "office_id": str(item.county_office_id),
+        "item": {
+            "id": str(item.id),
+            "registry_number": item.registry_number,
+            "item_name": item.item_name,
+            "found_location": item.found_location,
+            "found_date": item.found_date.isoformat() if item.found_date else None,
+            "status": item.status,
+            "created_at": item.created_at.isoformat() if item.created_at else None,
+        },
+    }
+
+
+def _format_sse(event_id: int, data: dict[str, Any]) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {data['op']}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    def __init__(self, office_id: str):
+        self.office_id = office_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_FEED_QUEUE_SIZE)
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        # per office, in delivery order. Ids are unique but taken before commit,
+        # so they are not ordered: a resume replays what was delivered after the
+        # client's last event, never what has a larger id.
+        self._recent: dict[str, deque] = {}
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        for subscribers in self._subscribers.values():
+            for sub in subscribers:
+                self._push(sub, RESET)
+
+    def subscribe(self, office_id: str, last_event_id: Optional[int]) -> tuple[Subscriber, list]:
+        sub = Subscriber(office_id)
+        self._subscribers.setdefault(office_id, set()).add(sub)
+
+        replay: list = []
+        if last_event_id is not None:
+            recent = self._recent.get(office_id, ())
+            position = next((i for i, (eid, _) in enumerate(recent) if eid == last_event_id), None)
+            if position is None:
+                # evicted, or delivered before this worker listened: the gap is unknown
+                replay = [RESET]
+            else:
+                replay = [msg for _, msg in itertools.islice(recent, position + 1, None)]
+        return sub, replay
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subscribers = self._subscribers.get(sub.office_id)
+        if subscribers is not None:
+            subscribers.discard(sub)
+            if not subscribers:
+                del self._subscribers[sub.office_id]
+
+    def _push(self, sub: Subscriber, message) -> None:
+        try:
+            sub.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # slow consumer: drop its backlog and tell it to refetch instead of
+            # buffering without bound
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(RESET)
+
+    def dispatch(self, event_id: int, data: dict[str, Any]) -> None:
+        office_id = data["office_id"]
+        message = _format_sse(event_id, data)
+
+        recent = self._recent.setdefault(office_id, deque())
+        recent.append((event_id, message))
+        if len(recent) > LIVE_FEED_BUFFER_SIZE:
+            recent.popleft()
+
+        for sub in tuple(self._subscribers.get(office_id, ())):
+            self._push(sub, message)
+
+    def reset_all(self) -> None:
+        # events may have been missed: no buffered id is a safe resume point
+        self._recent.clear()
+        for subscribers in self._subscribers.values():
+            for sub in subscribers:
+                self._push(sub, RESET)
+
+    def dispatch_threadsafe(self, event_id: int, data: dict[str, Any]) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self.dispatch, event_id, data)
+
+    def publish(self, db: Session, data: dict[str, Any]) -> None:
+        db.info.setdefault("live_feed_events", []).append(data)
+
+    def after_commit(self, db: Session) -> None:
+        for data in db.info.pop("live_feed_events", ()):
+            self.dispatch_threadsafe(next(self._ids), data)
+
+
+class PostgresBroker(InMemoryBroker):
+    # One LISTEN connection per worker, read from the event loop itself, feeds the
+    # same in-process fan-out as the in-memory broker. NOTIFY is transactional,
+    # so only committed changes are ever delivered.
+    def __init__(self):
+        super().__init__()
+        self._conn = None
+        self._fd: Optional[int] = None
+        self._connecting: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        await super().start()
+        await self._connect()
+
+    def _open(self):
+        import psycopg2
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {LIVE_FEED_CHANNEL}")
+        return conn
+
+    async def _connect(self) -> None:
+        try:
+            # connecting blocks for up to the TCP timeout: keep it off the loop
+            conn = await asyncio.to_thread(self._open)
+        except Exception:
+            logger.exception("Live feed LISTEN connection failed, retrying")
+            self._reconnect_later(5)
+            return
+        if self._stopping:
+            conn.close()
+            return
+
+        self._conn = conn
+        self._fd = conn.fileno()
+        self._loop.add_reader(self._fd, self._on_readable)
+        # whatever was committed while not listening never arrives
+        self.reset_all()
+        self._drain()
+
+    def _reconnect_later(self, delay: float) -> None:
+        if not self._stopping:
+            self._loop.call_later(delay, self._start_connect)
+
+    def _start_connect(self) -> None:
+        # keep a reference: the loop holds tasks only weakly
+        self._connecting = self._loop.create_task(self._connect())
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception:
+            logger.exception("Live feed LISTEN connection lost, reconnecting")
+            self._loop.remove_reader(self._fd)
+            self._conn = None
+            self._reconnect_later(1)
+            return
+        self._drain()
+
+    def _drain(self) -> None:
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                data = json.loads(notify.payload)
+                self.dispatch(data.pop("id"), data)
+            except Exception:
+                logger.exception("Malformed live feed notification")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._conn is not None:
+            self._loop.remove_reader(self._fd)
+            self._conn.close()
+            self._conn = None
+        await super().stop()
+
+    def publish(self, db: Session, data: dict[str, Any]) -> None:
+        db.execute(
+            text("""
+                SELECT pg_notify(
+                    :channel,
+                    jsonb_set(CAST(:payload AS jsonb), '{id}', to_jsonb(nextval('found_item_events_seq')))::text
+                )
+            """),
+            {"channel": LIVE_FEED_CHANNEL, "payload": json.dumps(data, ensure_ascii=False)},
+        )
+
+    def after_commit(self, db: Session) -> None:
+        pass
+
+
+broker = PostgresBroker() if LIVE_FEED_BROKER == "postgres" else InMemoryBroker()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    broker.after_commit(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_rollback(session: Session) -> None:
+    session.info.pop("live_feed_events", None)
+
+
+def publish_item_event(db: Session, item: FoundItem, op: str) -> None:
+    if item.county_office_id is None:
+        return
+    broker.publish(db, item_event(item, op))
+
+
+def _authorize_stream(request: Request, access_token: Optional[str], office_id: str) -> uuid.UUID:
+    token = access_token
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.lower().startswith("bearer "):
+        token = auth_header.split(" ", 1)[1].strip()
+    if not token:
+        raise HTTPException(401, detail="Not authenticated")
+    payload = validate_access_token(token)
+
+    try:
+        office_uuid = uuid.UUID(office_id)
+    except ValueError:
+        raise HTTPException(400, detail="Invalid office_id")
+
+    # short-lived session: a stream can stay open for hours and must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        member = db.execute(
+            select(starostwo_users.c.user_id).where(
+                starostwo_users.c.county_office_id == office_uuid,
+                starostwo_users.c.user_id == int(payload.get("user_id") or 0),
+            )
+        ).first()
+    finally:
+        db.close()
+
+    if not member:
+        raise HTTPException(403, detail="Not a member of this county office")
+    return office_uuid
+
+
+# EventSource cannot send headers, so the token may also come as ?access_token=
+@router.get("/{office_id}/stream")
+async def stream_office_items(
+    office_id: str,
+    request: Request,
+    access_token: Optional[str] = Query(None),
+    last_event_id: Optional[int] = Query(None),
+):
+    office_uuid = await run_in_threadpool(_authorize_stream, request, access_token, office_id)
+
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+
+    sub, replay = broker.subscribe(str(office_uuid), last_event_id)
+
+    async def events():
+        try:
+            yield b"retry: 3000\n: connected\n\n"
+            pending = list(replay)
+            while True:
+                if pending:
+                    message = pending.pop(0)
+                else:
+                    try:
+                        message = await asyncio.wait_for(sub.queue.get(), timeout=LIVE_FEED_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield b": ping\n\n"
+                        continue
+
+                if message is RESET:
+                    yield b"event: reset\ndata: {}\n\n"
+                    continue
+                yield message
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
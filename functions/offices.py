@@ -0,0 +1,310 @@
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session, lazyload
+
+from context.db import get_read_db
+from functions.auth import get_current_user_token
+from functions.county_offices import OfficeInfo, office_directory
+from functions.data_versions import get_data_version, office_scope
+from functions.found_item_forms import require_read_user, to_form_response
+from functions.geocoding import bounding_box, haversine_m
+from functions.query_plans import estimated_rows
+from functions.vocabulary import match_brand, match_color
+from models.models import ACTIVE_ITEM_STATUSES, ITEM_STATUSES, FoundItem, User
+from schemas.county_office import CountyOfficeResponse
+from schemas.found_item_form import FoundItemFormPage, FoundItemMapPoint
+
+EXACT_COUNT_THRESHOLD = int(os.getenv("EXACT_COUNT_THRESHOLD", "5000"))
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "300"))
+COUNT_CACHE_SIZE = 10000
+MAP_MAX_RADIUS_M = 50_000
+MAP_MAX_POINTS = 1000
+
+router = APIRouter(prefix="/offices", tags=["offices"])
+
+
+@dataclass(frozen=True)
+class OfficeItemFilters:
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    color: Optional[str] = None
+    brand: Optional[str] = None
+    location_prefix: Optional[str] = None
+    registry_number: Optional[str] = None
+    status: Optional[str] = None
+    active_only: bool = False
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Every filter maps onto one of the (county_office_id, ...) indexes in models.py;
+# scripts/check_query_plans.py fails if a combination ends up in a sequential scan.
+def office_items_query(db: Session, office_id: uuid.UUID, filters: OfficeItemFilters):
+    query = (
+        db.query(FoundItem)
+        .options(lazyload(FoundItem.county_office))
+        .filter(FoundItem.county_office_id == office_id)
+    )
+
+    if filters.date_from:
+        query = query.filter(FoundItem.found_date >= datetime.combine(filters.date_from, datetime.min.time()))
+    if filters.date_to:
+        query = query.filter(
+            FoundItem.found_date < datetime.combine(filters.date_to + timedelta(days=1), datetime.min.time())
+        )
+    # a spelling the vocabulary has never seen can only match items kept as free text
+    if filters.color:
+        color_id, color_text = match_color(filters.color)
+        query = query.filter(
+            FoundItem.item_color_id == color_id if color_id is not None else FoundItem.item_color == color_text
+        )
+    if filters.brand:
+        brand_id, brand_text = match_brand(filters.brand)
+        query = query.filter(
+            FoundItem.item_brand_id == brand_id if brand_id is not None else FoundItem.item_brand == brand_text
+        )
+    if filters.location_prefix:
+        query = query.filter(FoundItem.found_location.like(_escape_like(filters.location_prefix) + "%", escape="\\"))
+    if filters.registry_number:
+        query = query.filter(FoundItem.registry_number == filters.registry_number)
+    if filters.status:
+        query = query.filter(FoundItem.status == filters.status)
+    if filters.active_only:
+        # must match the partial index predicate for the planner to use it
+        query = query.filter(FoundItem.status.in_(ACTIVE_ITEM_STATUSES))
+    return query
+
+
+class CountCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+count_cache = CountCache(COUNT_CACHE_SIZE, COUNT_CACHE_TTL_SECONDS)
+
+
+# Large results get the planner's row estimate instead of COUNT(*); small ones
+# are cheap to count exactly. Either way the answer is cached per data version.
+def office_items_total(db: Session, office_id: uuid.UUID, filters: OfficeItemFilters) -> tuple[int, bool]:
+    version = get_data_version(db, office_scope(office_id))
+    key = (str(office_id), filters, version)
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    query = office_items_query(db, office_id, filters).with_entities(FoundItem.id)
+    estimate = estimated_rows(db, query)
+    if estimate <= EXACT_COUNT_THRESHOLD:
+        result = (query.order_by(None).count(), False)
+    else:
+        result = (estimate, True)
+
+    count_cache.put(key, result)
+    return result
+
+
+def _encode_cursor(item: FoundItem) -> str:
+    raw = json.dumps([item.found_date.isoformat(), str(item.id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        found_date, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(found_date), uuid.UUID(item_id)
+    except Exception:
+        raise HTTPException(400, detail="Invalid cursor")
+
+
+def to_office_response(office: OfficeInfo) -> CountyOfficeResponse:
+    return CountyOfficeResponse(
+        id=str(office.id),
+        code=office.code,
+        county_name=office.county_name,
+        county_code=office.county_code,
+        voivodeship_name=office.voivodeship_name,
+        voivodeship_code=office.voivodeship_code,
+    )
+
+
+# served from the per-worker office directory, no database round trip
+@router.get("", response_model=List[CountyOfficeResponse])
+def list_offices(
+    voivodeship_code: Optional[str] = Query(None, max_length=2),
+    token_data: dict = Depends(get_current_user_token),
+):
+    offices = office_directory.all()
+    if voivodeship_code:
+        offices = [o for o in offices if o.voivodeship_code == voivodeship_code]
+    return [to_office_response(o) for o in offices]
+
+
+@router.get("/by-code/{code}", response_model=CountyOfficeResponse)
+def get_office_by_code(
+    code: str,
+    token_data: dict = Depends(get_current_user_token),
+):
+    office = office_directory.by_code(code)
+    if office is None:
+        raise HTTPException(404, detail="County office not found")
+    return to_office_response(office)
+
+
+def require_office_member(office_id: str, user: User) -> uuid.UUID:
+    try:
+        office_uuid = uuid.UUID(office_id)
+    except ValueError:
+        raise HTTPException(400, detail="Invalid office_id")
+
+    if office_uuid not in {o.id for o in user.county_offices}:
+        raise HTTPException(403, detail="Not a member of this county office")
+    return office_uuid
+
+
+@router.get("/{office_id}/items", response_model=FoundItemFormPage)
+def list_office_items(
+    office_id: str,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    color: Optional[str] = Query(None, max_length=100),
+    brand: Optional[str] = Query(None, max_length=100),
+    location: Optional[str] = Query(None, max_length=255),
+    registry_number: Optional[str] = Query(None, max_length=32),
+    status: Optional[str] = Query(None, max_length=20),
+    active: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    office_uuid = require_office_member(office_id, current_user)
+    if status and status not in ITEM_STATUSES:
+        raise HTTPException(422, detail=f"Unknown status '{status}'")
+
+    filters = OfficeItemFilters(
+        date_from=date_from,
+        date_to=date_to,
+        color=color.strip() if color and color.strip() else None,
+        brand=brand.strip() if brand and brand.strip() else None,
+        location_prefix=location.strip() if location and location.strip() else None,
+        registry_number=registry_number.strip().upper() if registry_number and registry_number.strip() else None,
+        status=status or None,
+        active_only=active,
+    )
+
+    query = office_items_query(db, office_uuid, filters)
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(FoundItem.found_date, FoundItem.id) < tuple_(cursor_date, cursor_id))
+
+    items = query.order_by(FoundItem.found_date.desc(), FoundItem.id.desc()).limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    total, is_estimate = office_items_total(db, office_uuid, filters)
+
+    return FoundItemFormPage(
+        items=[to_form_response(i) for i in items],
+        next_cursor=_encode_cursor(items[-1]) if has_more else None,
+        total=total,
+        total_is_estimate=is_estimate,
+    )
+
+
+def _found_point():
+    # same expression as ix_found_items_found_point, or the GiST index is not used
+    return func.point(FoundItem.found_lon, FoundItem.found_lat)
+
+
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+@router.get("/{office_id}/items/nearby", response_model=List[FoundItemMapPoint])
+def list_office_items_nearby(
+    office_id: str,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: float = Query(500, gt=0, le=MAP_MAX_RADIUS_M),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    active: bool = Query(False),
+    limit: int = Query(200, ge=1, le=MAP_MAX_POINTS),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    office_uuid = require_office_member(office_id, current_user)
+
+    by_radius = lat is not None and lon is not None
+    if by_radius:
+        box = bounding_box(lat, lon, radius_m)
+    elif bbox:
+        box = _parse_bbox(bbox)
+    else:
+        raise HTTPException(400, detail="Provide lat and lon, or bbox")
+
+    min_lon, min_lat, max_lon, max_lat = box
+    query = office_items_query(db, office_uuid, OfficeItemFilters(active_only=active)).filter(
+        FoundItem.found_lat.isnot(None),
+        _found_point().op("<@")(func.box(func.point(min_lon, min_lat), func.point(max_lon, max_lat))),
+    )
+
+    if by_radius:
+        # nearest first straight from the GiST index; the box corners outside
+        # the circle are dropped below with the exact distance
+        query = query.order_by(_found_point().op("<->")(func.point(lon, lat)))
+    else:
+        query = query.order_by(FoundItem.found_date.desc(), FoundItem.id.desc())
+
+    points = []
+    for item in query.limit(limit).all():
+        distance = haversine_m(lat, lon, item.found_lat, item.found_lon) if by_radius else None
+        if distance is not None and distance > radius_m:
+            continue
+        points.append(FoundItemMapPoint(
+            id=str(item.id),
+            registry_number=item.registry_number,
+            item_name=item.item_name,
+            status=item.status,
+            found_date=item.found_date,
+            lat=item.found_lat,
+            lon=item.found_lon,
+            distance_m=round(distance, 1) if distance is not None else None,
+        ))
+    return points
@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+FOUND_ITEMS_PARTITION_YEARS_AHEAD = int(os.getenv("FOUND_ITEMS_PARTITION_YEARS_AHEAD", "1"))
+# 0 keeps one partition per year, N > 0 splits every year by HASH (county_office_id)
+FOUND_ITEMS_OFFICE_PARTITIONS = int(os.getenv("FOUND_ITEMS_OFFICE_PARTITIONS", "0"))
+# a year whose partition could not be created is not retried before this
+FOUND_ITEMS_PARTITION_RETRY_SECONDS = float(os.getenv("FOUND_ITEMS_PARTITION_RETRY_SECONDS", "3600"))
+
+_ensured_years: set[int] = set()
+# year -> monotonic time of the next attempt
+_failed_years: dict[int, float] = {}
+_ensured_lock = threading.Lock()
+
+
+def is_partitioned(conn: Connection, table: str = "found_items") -> bool:
+    return bool(conn.execute(
+        text("""
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table AND pg_table_is_visible(c.oid)
+        """),
+        {"table": table},
+    ).scalar())
+
+
+def year_partition_name(year: int) -> str:
+    return f"found_items_y{year}"
+
+
+def create_year_partition(
+    conn: Connection,
+    year: int,
+    office_partitions: int = FOUND_ITEMS_OFFICE_PARTITIONS,
+    parent: str = "found_items",
+) -> None:
+    name = year_partition_name(year)
+    exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return
+
+    bounds = f"FROM ('{year}-01-01 00:00:00+00') TO ('{year + 1}-01-01 00:00:00+00')"
+    if office_partitions > 0:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES {bounds} "
+            f"PARTITION BY HASH (county_office_id)"
+        ))
+        for remainder in range(office_partitions):
+            conn.execute(text(
+                f"CREATE TABLE {name}_h{remainder} PARTITION OF {name} "
+                f"FOR VALUES WITH (MODULUS {office_partitions}, REMAINDER {remainder})"
+            ))
+    else:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES {bounds}"))
+
+
+def _due_years(wanted: set[int]) -> set[int]:
+    now = time.monotonic()
+    return {y for y in wanted - _ensured_years if _failed_years.get(y, 0) <= now}
+
+
+def ensure_found_item_partitions(engine: Engine, year: int | None = None) -> None:
+    year = year or datetime.utcnow().year
+    wanted = set(range(year, year + FOUND_ITEMS_PARTITION_YEARS_AHEAD + 1))
+    # called on every intake: when nothing is due this must not touch the database
+    if not _due_years(wanted):
+        return
+
+    with _ensured_lock:
+        due = _due_years(wanted)
+        if not due:
+            return
+
+        with engine.begin() as conn:
+            if not is_partitioned(conn):
+                # plain table: nothing to create, and no reason to check again
+                _ensured_years.update(wanted)
+                return
+
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('found_items_partitions'))"))
+            for y in sorted(due):
+                try:
+                    with conn.begin_nested():
+                        create_year_partition(conn, y)
+                except Exception:
+                    # usually rows for that year already sit in the default partition
+                    logger.exception(
+                        "Could not create partition %s, retrying in %ss",
+                        year_partition_name(y), FOUND_ITEMS_PARTITION_RETRY_SECONDS,
+                    )
+                    _failed_years[y] = time.monotonic() + FOUND_ITEMS_PARTITION_RETRY_SECONDS
+                    continue
+                _ensured_years.add(y)
+                _failed_years.pop(y, None)
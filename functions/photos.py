@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.config import SessionLocal
+from context.db import get_read_db, pin_to_primary
+from functions.blob_store import get_blob_store
+from functions.auth import get_current_user_token
+from functions.found_item_forms import get_accessible_item, require_read_user, require_user
+from functions.image_variants import (
+    PHOTO_CACHE_CONTROL,
+    PHOTO_VARIANTS,
+    original_key,
+    render_variants,
+    variant_key,
+)
+from models.models import FoundItemPhoto, PhotoBlob, User
+from schemas.found_item_photo import FoundItemPhotoResponse
+
+logger = logging.getLogger(__name__)
+
+PHOTO_MAX_BYTES = int(os.getenv("PHOTO_MAX_BYTES", str(15 * 1024 * 1024)))
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "2"))
+
+PHOTO_MAGIC = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/webp": (b"RIFF",),
+}
+
+router = APIRouter(tags=["photos"])
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_scheduled: set[str] = set()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the parent runs threads and holds DB connections
+            _pool = ProcessPoolExecutor(max_workers=PHOTO_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _mark_variants_ready(content_hash: str, future: Future) -> None:
+    with _pool_lock:
+        _scheduled.discard(content_hash)
+
+    try:
+        width, height = future.result()
+    except Exception:
+        logger.exception("Rendering photo variants failed for %s", content_hash)
+        return
+
+    db = SessionLocal()
+    try:
+        db.query(PhotoBlob).filter(PhotoBlob.content_hash == content_hash).update(
+            {"width": width, "height": height, "variants_ready": True},
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def schedule_variants(content_hash: str) -> None:
+    with _pool_lock:
+        if content_hash in _scheduled:
+            return
+        _scheduled.add(content_hash)
+
+    future = _get_pool().submit(render_variants, content_hash)
+    future.add_done_callback(lambda f: _mark_variants_ready(content_hash, f))
+
+
+def shutdown_photo_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _accessible_photo(db: Session, user: User, photo_id: str) -> FoundItemPhoto:
+    try:
+        photo_uuid = uuid.UUID(photo_id)
+    except ValueError:
+        raise HTTPException(400, detail="Invalid photo_id")
+
+    photo = db.query(FoundItemPhoto).filter(FoundItemPhoto.id == photo_uuid).first()
+    if not photo:
+        raise HTTPException(404, detail="Photo not found")
+    get_accessible_item(db, user, str(photo.found_item_id))
+    return photo
+
+
+def to_photo_response(photo: FoundItemPhoto) -> FoundItemPhotoResponse:
+    blob = photo.blob
+    return FoundItemPhotoResponse(
+        id=str(photo.id),
+        found_item_id=str(photo.found_item_id),
+        content_hash=blob.content_hash,
+        content_type=blob.content_type,
+        size=blob.size,
+        width=blob.width,
+        height=blob.height,
+        variants_ready=blob.variants_ready,
+        original_url=f"/photos/{photo.id}/original",
+        thumbnail_url=f"/photos/{photo.id}/thumb",
+        medium_url=f"/photos/{photo.id}/medium",
+        created_at=photo.created_at,
+    )
+
+
+def _authorize_upload(token_data: dict, item_id: str) -> tuple[int, uuid.UUID]:
+    # short-lived session: it must not stay checked out while the body streams in
+    db = SessionLocal()
+    try:
+        user = require_user(token_data, db)
+        item = get_accessible_item(db, user, item_id)
+        return user.id, item.id
+    finally:
+        db.close()
+
+
+def _save_photo(
+    item_id: uuid.UUID,
+    user_id: int,
+    tmp_path: str,
+    content_hash: str,
+    content_type: str,
+    size: int,
+) -> FoundItemPhotoResponse:
+    db = SessionLocal()
+    try:
+        existing = (
+            db.query(FoundItemPhoto)
+            .filter(FoundItemPhoto.found_item_id == item_id, FoundItemPhoto.content_hash == content_hash)
+            .first()
+        )
+        if existing:
+            return to_photo_response(existing)
+
+        store = get_blob_store()
+        key = original_key(content_hash)
+        if not store.exists(key):
+            store.put_file(key, tmp_path, content_type, PHOTO_CACHE_CONTROL)
+
+        db.execute(
+            insert(PhotoBlob)
+            .values(content_hash=content_hash, content_type=content_type, size=size, variants_ready=False)
+            .on_conflict_do_nothing(index_elements=[PhotoBlob.content_hash])
+        )
+
+        # a concurrent upload of the same file may win: both end up with its row
+        db.execute(
+            insert(FoundItemPhoto)
+            .values(found_item_id=item_id, content_hash=content_hash, uploaded_by=user_id)
+            .on_conflict_do_nothing(index_elements=[FoundItemPhoto.found_item_id, FoundItemPhoto.content_hash])
+        )
+        db.commit()
+
+        photo = (
+            db.query(FoundItemPhoto)
+            .filter(FoundItemPhoto.found_item_id == item_id, FoundItemPhoto.content_hash == content_hash)
+            .one()
+        )
+        return to_photo_response(photo)
+    finally:
+        db.close()
+
+
+# The body is the raw image (Content-Type: image/jpeg|png|webp), streamed to a
+# temp file while it is hashed, so a large upload never sits in memory. No
+# database session is open while it streams: a slow client must not hold a
+# pooled connection.
+@router.post("/found-item-forms/{item_id}/photos", response_model=FoundItemPhotoResponse, status_code=201)
+async def upload_found_item_photo(
+    item_id: str,
+    request: Request,
+    response: Response,
+    token_data: dict = Depends(get_current_user_token),
+):
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if content_type not in PHOTO_MAGIC:
+        raise HTTPException(415, detail="Only JPEG, PNG and WEBP photos are supported")
+
+    user_id, item_uuid = await run_in_threadpool(_authorize_upload, token_data, item_id)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(prefix="photo-upload-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                if not chunk:
+                    continue
+                if size == 0 and not chunk.startswith(PHOTO_MAGIC[content_type]):
+                    raise HTTPException(415, detail="Photo content does not match its Content-Type")
+                size += len(chunk)
+                if size > PHOTO_MAX_BYTES:
+                    raise HTTPException(413, detail="Photo is too large")
+                digest.update(chunk)
+                f.write(chunk)
+
+        if size == 0:
+            raise HTTPException(400, detail="Empty photo")
+
+        content_hash = digest.hexdigest()
+        photo = await run_in_threadpool(
+            _save_photo, item_uuid, user_id, tmp_path, content_hash, content_type, size
+        )
+    finally:
+        os.unlink(tmp_path)
+
+    if not photo.variants_ready:
+        schedule_variants(content_hash)
+    # the gallery reads from the replica: show this clerk the new photo
+    pin_to_primary(response, user_id)
+    return photo
+
+
+@router.get("/found-item-forms/{item_id}/photos", response_model=List[FoundItemPhotoResponse])
+def list_found_item_photos(
+    item_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    item = get_accessible_item(db, current_user, item_id)
+    photos = (
+        db.query(FoundItemPhoto)
+        .filter(FoundItemPhoto.found_item_id == item.id)
+        .order_by(FoundItemPhoto.created_at)
+        .all()
+    )
+    return [to_photo_response(p) for p in photos]
+
+
+def _parse_range(header: Optional[str], size: int):
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return "invalid"
+    if start >= size or start > end:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+def _serve_blob(request: Request, key: str, content_type: str, etag: str) -> Response:
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": PHOTO_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    store = get_blob_store()
+    local = store.local_path(key)
+    if local is not None:
+        if not os.path.exists(local):
+            raise HTTPException(404, detail="Photo not found")
+        # FileResponse handles Range itself and lets the server use sendfile
+        return FileResponse(local, media_type=content_type, headers=headers)
+
+    size = store.size(key)
+    byte_range = _parse_range(request.headers.get("range"), size)
+    if byte_range == "invalid":
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        store.iter_range(key, start, end),
+        status_code=status_code,
+        media_type=content_type,
+        headers=headers,
+    )
+
+
+@router.get("/photos/{photo_id}/original")
+def get_photo_original(
+    photo_id: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    photo = _accessible_photo(db, current_user, photo_id)
+    blob = photo.blob
+    return _serve_blob(request, original_key(blob.content_hash), blob.content_type, blob.content_hash)
+
+
+@router.get("/photos/{photo_id}/{variant}")
+def get_photo_variant(
+    photo_id: str,
+    variant: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    if variant not in PHOTO_VARIANTS:
+        raise HTTPException(404, detail="Unknown photo variant")
+
+    photo = _accessible_photo(db, current_user, photo_id)
+    blob = photo.blob
+    if not blob.variants_ready:
+        # never fall back to decoding the original on the request path
+        schedule_variants(blob.content_hash)
+        raise HTTPException(404, detail="Photo variant not ready yet", headers={"Retry-After": "2"})
+
+    return _serve_blob(
+        request,
+        variant_key(blob.content_hash, variant),
+        "image/jpeg",
+        f"{blob.content_hash}-{variant}",
+    )
@@ -0,0 +1,226 @@
+import csv
+import glob
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from config.config import engine
+from config.logging_config import request_context
+
+logger = logging.getLogger(__name__)
+
+PII_AUDIT_MAX_PENDING = int(os.getenv("PII_AUDIT_MAX_PENDING", "100000"))
+PII_AUDIT_BATCH_SIZE = int(os.getenv("PII_AUDIT_BATCH_SIZE", "2000"))
+PII_AUDIT_FLUSH_SECONDS = float(os.getenv("PII_AUDIT_FLUSH_SECONDS", "1"))
+# how long a request may wait for room before its events go to disk instead
+PII_AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("PII_AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+PII_AUDIT_SPILL_DIR = os.getenv("PII_AUDIT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "pii_audit_spill"))
+# a claimed spill file this old belongs to a worker that died while replaying it
+PII_AUDIT_STALE_CLAIM_SECONDS = 600
+
+PII_AUDIT_COLUMNS = ("found_item_id", "user_id", "action", "route", "request_id", "accessed_at")
+
+FINDER_PII_FIELDS = ("found_by_firstname", "found_by_lastname", "found_by_phonenumber")
+
+
+def has_finder_pii(item) -> bool:
+    return any(getattr(item, f, None) for f in FINDER_PII_FIELDS)
+
+
+class PiiAuditWriter:
+    # Request threads only append to an in-memory buffer; a background thread
+    # drains it with COPY. Past max_pending unflushed events a request waits at
+    # most enqueue_timeout, then writes its events to a spill file, which the
+    # writer loads once the database keeps up again. Events are never dropped.
+    def __init__(self, max_pending: int, batch_size: int, flush_seconds: float, enqueue_timeout: float, spill_dir: str):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_dir = spill_dir
+        self._buffer: list[tuple] = []
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="pii-audit-writer", daemon=True)
+                self._thread.start()
+
+    def record(self, item_ids: Iterable, action: str = "read") -> None:
+        ctx = request_context.get() or {}
+        now = datetime.now(timezone.utc).isoformat()
+        events = [
+            (str(item_id), ctx.get("user_id"), action, (ctx.get("route") or "")[:200] or None, ctx.get("request_id"), now)
+            for item_id in item_ids
+        ]
+        if not events:
+            return
+        self._ensure_started()
+
+        with self._cond:
+            fits = lambda: self._pending + len(events) <= self.max_pending
+            if fits() or self._cond.wait_for(fits, timeout=self.enqueue_timeout):
+                self._buffer.extend(events)
+                self._pending += len(events)
+                if len(self._buffer) >= self.batch_size:
+                    self._cond.notify_all()
+                return
+        # the writer is behind: keep the request moving, the file is replayed later
+        self._spill(events)
+
+    def _spill(self, events: list[tuple]) -> None:
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, default=str))
+                f.write("\n")
+        # complete files only: a replaying worker never sees half a batch
+        os.replace(tmp_path, os.path.join(self.spill_dir, f"{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"))
+        with self._cond:
+            self.spilled += len(events)
+
+    def _copy(self, events: list[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for event in events:
+            writer.writerow(["" if v is None else v for v in event])
+        buffer.seek(0)
+
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.copy_expert(f"COPY pii_access_log ({', '.join(PII_AUDIT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.close()
+            raw.commit()
+        finally:
+            raw.close()
+
+    def _replay_one(self) -> bool:
+        now = time.time()
+        paths = sorted(glob.glob(os.path.join(self.spill_dir, "*.jsonl")))
+        paths += sorted(glob.glob(os.path.join(self.spill_dir, "*.claimed-*")))
+        for path in paths:
+            if ".claimed-" in path:
+                try:
+                    if now - os.stat(path).st_mtime < PII_AUDIT_STALE_CLAIM_SECONDS:
+                        continue
+                except FileNotFoundError:
+                    continue
+            claimed = f"{path.split('.claimed-')[0]}.claimed-{os.getpid()}"
+            try:
+                # rename is atomic: only one worker wins each file
+                os.rename(path, claimed)
+                os.utime(claimed)
+            except FileNotFoundError:
+                continue
+            with open(claimed, encoding="utf-8") as f:
+                events = [tuple(json.loads(line)) for line in f if line.strip()]
+            try:
+                self._copy(events)
+            except Exception:
+                os.rename(claimed, path.split(".claimed-")[0])
+                raise
+            os.unlink(claimed)
+            with self._cond:
+                self.replayed += len(events)
+            return True
+        return False
+
+    def _run(self) -> None:
+        next_replay = 0.0
+        replayed = False
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._buffer) >= self.batch_size or self._stopping,
+                    # while a spill backlog drains, go round without idling
+                    timeout=0 if replayed else self.flush_seconds,
+                )
+                batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+                stopping = self._stopping and not self._buffer
+
+            if batch:
+                try:
+                    self._copy(batch)
+                    with self._cond:
+                        self.written += len(batch)
+                except Exception:
+                    logger.exception("Writing %d PII audit events failed, spilling to disk", len(batch))
+                    self._spill(batch)
+                    next_replay = time.monotonic() + self.flush_seconds * 10
+                with self._cond:
+                    self._pending -= len(batch)
+                    self._cond.notify_all()
+
+            if stopping:
+                return
+            # one spill file per round, so live events never queue behind a backlog
+            replayed = False
+            if time.monotonic() >= next_replay:
+                try:
+                    replayed = self._replay_one()
+                except Exception:
+                    logger.exception("Replaying spilled PII audit events failed")
+                    replayed = False
+                if not replayed:
+                    next_replay = time.monotonic() + self.flush_seconds * 10
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._cond:
+            thread, self._stopping = self._thread, True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            leftover, self._buffer = self._buffer, []
+            self._pending -= len(leftover)
+        if leftover:
+            # the writer did not finish in time: keep them for the next start
+            self._spill(leftover)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": self._pending,
+                "written": self.written,
+                "spilled": self.spilled,
+                "replayed": self.replayed,
+                "pid": os.getpid(),
+            }
+
+
+pii_audit = PiiAuditWriter(
+    PII_AUDIT_MAX_PENDING,
+    PII_AUDIT_BATCH_SIZE,
+    PII_AUDIT_FLUSH_SECONDS,
+    PII_AUDIT_ENQUEUE_TIMEOUT,
+    PII_AUDIT_SPILL_DIR,
+)
+
+
+def audit_pii_access(items: Iterable, action: str = "read") -> None:
+    # only items that actually carry finder data leave a trace
+    pii_audit.record((getattr(i, "id") for i in items if has_finder_pii(i)), action)
+
+
+def shutdown_pii_audit() -> None:
+    pii_audit.stop()
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from context.db import get_read_db
+from functions.found_item_forms import get_accessible_item, require_operator, require_read_user
+from functions.pii_audit import pii_audit
+from models.models import PiiAccessEvent, User, starostwo_users
+from schemas.pii_access import PiiAccessEventPage, PiiAccessEventResponse
+
+router = APIRouter(prefix="/pii-audit", tags=["pii-audit"])
+
+
+def _encode_cursor(event: PiiAccessEvent) -> str:
+    raw = json.dumps([event.accessed_at.isoformat(), event.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        accessed_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(accessed_at), int(event_id)
+    except Exception:
+        raise HTTPException(400, detail="Invalid cursor")
+
+
+# newest first; both callers filter on the leading column of one of the
+# (found_item_id | user_id, accessed_at, id) indexes
+def _events_page(
+    db: Session,
+    condition,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    limit: int,
+    cursor: Optional[str],
+) -> PiiAccessEventPage:
+    query = select(PiiAccessEvent).where(condition)
+    if date_from:
+        query = query.where(PiiAccessEvent.accessed_at >= datetime.combine(date_from, time.min, timezone.utc))
+    if date_to:
+        query = query.where(PiiAccessEvent.accessed_at < datetime.combine(date_to + timedelta(days=1), time.min, timezone.utc))
+    if cursor:
+        query = query.where(tuple_(PiiAccessEvent.accessed_at, PiiAccessEvent.id) < tuple_(*_decode_cursor(cursor)))
+
+    events = db.execute(
+        query.order_by(PiiAccessEvent.accessed_at.desc(), PiiAccessEvent.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    return PiiAccessEventPage(
+        items=[
+            PiiAccessEventResponse(
+                id=e.id,
+                found_item_id=str(e.found_item_id),
+                user_id=e.user_id,
+                action=e.action,
+                route=e.route,
+                request_id=e.request_id,
+                accessed_at=e.accessed_at,
+            )
+            for e in events
+        ],
+        next_cursor=_encode_cursor(events[-1]) if has_more else None,
+    )
+
+
+@router.get("/items/{item_id}", response_model=PiiAccessEventPage)
+def list_item_pii_access(
+    item_id: str,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    item = get_accessible_item(db, current_user, item_id)
+    return _events_page(db, PiiAccessEvent.found_item_id == item.id, date_from, date_to, limit, cursor)
+
+
+@router.get("/users/{user_id}", response_model=PiiAccessEventPage)
+def list_user_pii_access(
+    user_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_read_user),
+):
+    # your own trail, or that of someone in one of your offices
+    if user_id != current_user.id:
+        colleague = db.execute(
+            select(starostwo_users.c.user_id).where(
+                starostwo_users.c.user_id == user_id,
+                starostwo_users.c.county_office_id.in_([o.id for o in current_user.county_offices]),
+            ).limit(1)
+        ).first()
+        if not colleague:
+            raise HTTPException(403, detail="Not a member of this user's county office")
+
+    return _events_page(db, PiiAccessEvent.user_id == user_id, date_from, date_to, limit, cursor)
+
+
+@router.get("/writer-stats")
+def pii_audit_writer_stats(
+    current_user: User = Depends(require_operator),
+):
+    return pii_audit.stats()
@@ -0,0 +1,46 @@
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Query, Session
+
+# below this many rows a sequential scan can be the right plan
+SEQ_SCAN_MIN_ROWS = 50_000
+
+
+def _compile(db: Session, statement) -> tuple[str, dict]:
+    if isinstance(statement, Query):
+        statement = statement.statement
+    compiled = statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    return compiled.string, compiled.params
+
+
+def explain(db: Session, statement, analyze: bool = False, buffers: bool = False) -> dict[str, Any]:
+    sql, params = _compile(db, statement)
+    options = ["FORMAT JSON"]
+    if analyze:
+        options.append("ANALYZE")
+    if buffers:
+        options.append("BUFFERS")
+    result = db.connection().exec_driver_sql(f"EXPLAIN ({', '.join(options)}) {sql}", params).scalar()
+    return result[0]
+
+
+def estimated_rows(db: Session, statement) -> int:
+    return int(explain(db, statement)["Plan"]["Plan Rows"])
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    node = plan.get("Plan", plan)
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def seq_scanned_tables(plan: dict[str, Any]) -> set[str]:
+    return {
+        node.get("Relation Name")
+        for node in plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan"
+    }
@@ -0,0 +1,248 @@
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, status
+from starlette.responses import JSONResponse
+
+from functions.auth import get_current_user_token
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
+LOAD_SHEDDING_MIN_CONCURRENCY = int(os.getenv("LOAD_SHEDDING_MIN_CONCURRENCY", "4"))
+LOAD_SHEDDING_MAX_CONCURRENCY = int(os.getenv("LOAD_SHEDDING_MAX_CONCURRENCY", "64"))
+LOAD_SHEDDING_LATENCY_MS = float(os.getenv("LOAD_SHEDDING_LATENCY_MS", "1000"))
+LOAD_SHEDDING_POOL_WAIT_MS = float(os.getenv("LOAD_SHEDDING_POOL_WAIT_MS", "200"))
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: int
+    per_seconds: float
+    key: str = "ip"
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+# every per-route budget lives here
+RATE_LIMITS: dict[str, RateLimit] = {
+    "auth.login": RateLimit(capacity=10, per_seconds=60, key="ip"),
+    "auth.register": RateLimit(capacity=5, per_seconds=600, key="ip"),
+    "auth.refresh": RateLimit(capacity=30, per_seconds=60, key="ip"),
+    "found_items.create": RateLimit(capacity=60, per_seconds=60, key="user"),
+    "found_items.export": RateLimit(capacity=6, per_seconds=60, key="user"),
+    "found_items.receipts": RateLimit(capacity=10, per_seconds=60, key="user"),
+}
+
+
+class MemoryTokenBucketBackend:
+    # buckets that are full again carry no state and are swept this often
+    PRUNE_SECONDS = 60.0
+
+    def __init__(self):
+        # key -> (tokens, updated, monotonic time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.monotonic()
+
+    def _prune(self, now: float) -> None:
+        self._pruned_at = now
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+    def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        rate = limit.refill_per_second
+        with self._lock:
+            if now - self._pruned_at >= self.PRUNE_SECONDS:
+                self._prune(now)
+            tokens, updated, _ = self._buckets.get(key, (float(limit.capacity), now, now))
+            tokens = min(float(limit.capacity), tokens + (now - updated) * rate)
+            retry = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (limit.capacity - tokens) / rate)
+            return retry
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry)
+"""
+
+
+class RedisTokenBucketBackend:
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        try:
+            return float(self._script(keys=[key], args=[limit.capacity, limit.refill_per_second, cost]))
+        except Exception:
+            # a limiter outage must not take the API down with it
+            logger.warning("Rate limit backend unavailable, allowing request", exc_info=True)
+            return 0.0
+
+
+def _make_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucketBackend(REDIS_URL)
+    return MemoryTokenBucketBackend()
+
+
+rate_limit_backend = _make_backend()
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _client_user_id(request: Request) -> Optional[str]:
+    try:
+        return str(get_current_user_token(request).get("user_id"))
+    except HTTPException:
+        return None
+
+
+def rate_limit(route: str) -> Callable[[Request], None]:
+    limit = RATE_LIMITS[route]
+
+    def dependency(request: Request) -> None:
+        subject = None
+        if limit.key == "user":
+            subject = _client_user_id(request)
+            subject = f"user:{subject}" if subject else None
+        if subject is None:
+            subject = f"ip:{client_ip(request)}"
+
+        retry_after = rate_limit_backend.acquire(f"rl:{route}:{subject}", limit)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
+
+
+class AdaptiveConcurrencyLimiter:
+    # AIMD: the limit grows by one while latency and pool wait stay under their
+    # targets and shrinks by 10% as soon as either moving average crosses them.
+    def __init__(self, min_limit: int, max_limit: int, latency_target: float, pool_wait_target: float):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.pool_wait_target = pool_wait_target
+        self.limit = float(max_limit)
+        self.inflight = 0
+        self.latency_ewma = 0.0
+        self.pool_wait_ewma = 0.0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                self.shed += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, latency: float) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self.latency_ewma = 0.9 * self.latency_ewma + 0.1 * latency
+            overloaded = (
+                self.latency_ewma > self.latency_target
+                or self.pool_wait_ewma > self.pool_wait_target
+            )
+            if overloaded:
+                self.limit = max(float(self.min_limit), self.limit * 0.9)
+            elif self.inflight + 1 >= int(self.limit):
+                self.limit = min(float(self.max_limit), self.limit + 1)
+
+    def record_pool_wait(self, wait: float) -> None:
+        with self._lock:
+            self.pool_wait_ewma = 0.9 * self.pool_wait_ewma + 0.1 * wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "inflight": self.inflight,
+                "latency_ewma_ms": round(self.latency_ewma * 1000, 2),
+                "pool_wait_ewma_ms": round(self.pool_wait_ewma * 1000, 2),
+                "shed": self.shed,
+            }
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    LOAD_SHEDDING_MIN_CONCURRENCY,
+    LOAD_SHEDDING_MAX_CONCURRENCY,
+    LOAD_SHEDDING_LATENCY_MS / 1000,
+    LOAD_SHEDDING_POOL_WAIT_MS / 1000,
+)
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter, exclude_suffixes: tuple[str, ...] = ()):
+        self.app = app
+        self.limiter = limiter
+        # long-lived streams would hold a slot for their whole lifetime
+        self.exclude_suffixes = exclude_suffixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].endswith(self.exclude_suffixes):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(time.perf_counter() - started)
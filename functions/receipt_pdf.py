@@ -0,0 +1,177 @@
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+from functions.export_cache import ExportCache
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+# kept free of database imports: this module is what the worker processes load
+
+RECEIPT_CACHE_DIR = os.getenv("RECEIPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "receipt_cache"))
+RECEIPT_CACHE_MAX_BYTES = int(os.getenv("RECEIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# the built-in PDF fonts have no Polish diacritics, so a TTF is embedded
+RECEIPT_FONT_PATH = os.getenv("RECEIPT_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+RECEIPT_FONT_BOLD_PATH = os.getenv("RECEIPT_FONT_BOLD_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+
+# bump whenever the layout changes: it is part of every cache key
+RECEIPT_TEMPLATE_REVISION = 1
+
+receipt_cache = ExportCache(RECEIPT_CACHE_DIR, RECEIPT_CACHE_MAX_BYTES)
+
+
+@dataclass(frozen=True)
+class ReceiptData:
+    registry_number: str
+    office_name: str
+    item_name: str
+    item_color: Optional[str]
+    item_brand: Optional[str]
+    found_location: Optional[str]
+    found_at: str
+    circumstances: Optional[str]
+    finder_name: Optional[str]
+    finder_phone: Optional[str]
+    received_at: str
+    received_by: Optional[str]
+
+
+# (label, ReceiptData field, lines the value may wrap to)
+RECEIPT_FIELDS = [
+    ("Przedmiot", "item_name", 2),
+    ("Kolor", "item_color", 1),
+    ("Marka", "item_brand", 1),
+    ("Miejsce znalezienia", "found_location", 2),
+    ("Data i godzina znalezienia", "found_at", 1),
+    ("Okoliczności znalezienia", "circumstances", 4),
+    ("Znalazca", "finder_name", 1),
+    ("Telefon znalazcy", "finder_phone", 1),
+    ("Data przyjęcia", "received_at", 1),
+    ("Przyjmujący", "received_by", 1),
+]
+
+LEGAL_NOTE = (
+    "Potwierdzam przyjęcie rzeczy znalezionej na podstawie ustawy z dnia 20 lutego 2015 r. "
+    "o rzeczach znalezionych. Przy odbiorze rzeczy należy okazać niniejsze potwierdzenie "
+    "i dokument tożsamości."
+)
+
+
+def receipt_key(receipts: list[ReceiptData]) -> str:
+    # An item's version is whatever ends up printed: a receipt is re-rendered
+    # only when one of its fields or the template changes.
+    raw = json.dumps([RECEIPT_TEMPLATE_REVISION, [dataclasses.astuple(r) for r in receipts]], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    font: str
+    bold_font: str
+    draw_static: Callable
+    # (field, x, y, width, max lines)
+    slots: tuple[tuple[str, float, float, float, int], ...]
+
+
+def _register_fonts() -> tuple[str, str]:
+    # no fallback: a receipt without Polish characters is not a valid receipt
+    for name, path in (("ReceiptSans", RECEIPT_FONT_PATH), ("ReceiptSans-Bold", RECEIPT_FONT_BOLD_PATH)):
+        try:
+            pdfmetrics.registerFont(TTFont(name, path))
+        except Exception as e:
+            raise RuntimeError(f"Receipt font {path} not usable, install fonts-dejavu-core or set RECEIPT_FONT_PATH") from e
+    return "ReceiptSans", "ReceiptSans-Bold"
+
+
+# Built once per worker process: fonts, label positions and the static part of
+# the page. The static part becomes a PDF form object drawn once per file and
+# referenced from every page, so a batch of receipts only adds the field text.
+@lru_cache(maxsize=1)
+def compiled_template() -> CompiledTemplate:
+    font, bold = _register_fonts()
+    width, height = A4
+    left, right = 20 * mm, width - 20 * mm
+    value_x = left + 62 * mm
+
+    labels, slots = [], []
+    y = height - 62 * mm
+    for label, field, lines in RECEIPT_FIELDS:
+        labels.append((label, y))
+        slots.append((field, value_x, y, right - value_x, lines))
+        y -= (lines * 5 + 4) * mm
+    notes = simpleSplit(LEGAL_NOTE, font, 9, right - left)
+    notes_y = y - 4 * mm
+    signatures_y = notes_y - (len(notes) * 5 + 28) * mm
+
+    def draw_static(c) -> None:
+        c.setFont(bold, 14)
+        c.drawCentredString(width / 2, height - 25 * mm, "POTWIERDZENIE PRZYJĘCIA RZECZY ZNALEZIONEJ")
+        c.setFont(font, 10)
+        c.drawString(left, height - 48 * mm, "Nr ewidencyjny:")
+        c.setLineWidth(0.5)
+        c.line(left, height - 52 * mm, right, height - 52 * mm)
+        for label, label_y in labels:
+            c.drawString(left, label_y, f"{label}:")
+        c.setFont(font, 9)
+        for i, line in enumerate(notes):
+            c.drawString(left, notes_y - i * 5 * mm, line)
+        for x, caption in ((left, "podpis znalazcy"), (right - 70 * mm, "podpis i pieczęć przyjmującego")):
+            c.line(x, signatures_y, x + 70 * mm, signatures_y)
+            c.drawCentredString(x + 35 * mm, signatures_y - 5 * mm, caption)
+
+    return CompiledTemplate(font, bold, draw_static, tuple(slots))
+
+
+def render_receipts(receipts: list[ReceiptData]) -> bytes:
+    if canvas is None:
+        raise RuntimeError("reportlab not installed. Add it to requirements.")
+
+    template = compiled_template()
+    width, height = A4
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    c.setTitle("Potwierdzenie przyjęcia rzeczy znalezionej")
+
+    c.beginForm("receipt")
+    template.draw_static(c)
+    c.endForm()
+
+    for receipt in receipts:
+        c.doForm("receipt")
+        c.setFont(template.font, 10)
+        c.drawCentredString(width / 2, height - 33 * mm, receipt.office_name)
+        c.setFont(template.bold_font, 16)
+        c.drawString(20 * mm + 32 * mm, height - 48 * mm, receipt.registry_number)
+
+        c.setFont(template.font, 10)
+        for field, x, y, slot_width, max_lines in template.slots:
+            value = getattr(receipt, field) or "—"
+            lines = simpleSplit(value, template.font, 10, slot_width)
+            if len(lines) > max_lines:
+                lines = lines[:max_lines]
+                lines[-1] = lines[-1][:-1] + "…"
+            for i, line in enumerate(lines):
+                c.drawString(x, y - i * 5 * mm, line)
+        c.showPage()
+
+    c.save()
+    return buffer.getvalue()
+
+
+def render_receipts_to_cache(key: str, receipts: list[ReceiptData]) -> str:
+    # runs in a worker process; only the cache path travels back
+    return receipt_cache.put(key, render_receipts(receipts))
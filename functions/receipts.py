@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+
+from functions.receipt_pdf import ReceiptData, receipt_cache, receipt_key, render_receipts_to_cache
+from functions.vocabulary import display_value
+from models.models import FoundItem
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_WORKERS = int(os.getenv("RECEIPT_WORKERS", "2"))
+RECEIPT_RENDER_TIMEOUT = float(os.getenv("RECEIPT_RENDER_TIMEOUT", "30"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# renders in flight by cache key: a request arriving while the intake
+# pre-render runs waits for that render instead of starting another
+_inflight: dict[str, Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the parent runs threads and holds DB connections
+            _pool = ProcessPoolExecutor(max_workers=RECEIPT_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_receipt_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _fmt(dt, with_time: bool = True) -> str:
+    if not dt:
+        return ""
+    return dt.strftime("%Y-%m-%d %H:%M" if with_time else "%Y-%m-%d")
+
+
+def receipt_data(item: FoundItem) -> ReceiptData:
+    office = item.county_office
+    clerk = item.user
+    finder = " ".join(p for p in (item.found_by_firstname, item.found_by_lastname) if p)
+    found_at = _fmt(item.found_date, with_time=False)
+    if item.found_time:
+        found_at = f"{found_at} {item.found_time}"
+    return ReceiptData(
+        registry_number=item.registry_number or "",
+        office_name=office.county_name if office else "",
+        item_name=item.item_name,
+        item_color=display_value(item.item_color_id, item.item_color),
+        item_brand=display_value(item.item_brand_id, item.item_brand),
+        found_location=item.found_location,
+        found_at=found_at,
+        circumstances=item.circumstances,
+        finder_name=finder or None,
+        finder_phone=item.found_by_phonenumber,
+        received_at=_fmt(item.created_at),
+        received_by=f"{clerk.first_name} {clerk.last_name}" if clerk else None,
+    )
+
+
+def _render(key: str, receipts: list[ReceiptData]) -> Future:
+    pool = _get_pool()
+    with _pool_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _inflight[key] = pool.submit(render_receipts_to_cache, key, receipts)
+    future.add_done_callback(lambda f: _render_done(key, f))
+    return future
+
+
+def _render_done(key: str, future: Future) -> None:
+    with _pool_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Rendering receipt %s failed", key, exc_info=future.exception())
+
+
+def schedule_receipt(item: FoundItem) -> None:
+    # called right after intake so the clerk's print click finds it cached
+    try:
+        receipts = [receipt_data(item)]
+        _render(receipt_key(receipts), receipts)
+    except Exception:
+        logger.exception("Could not schedule receipt for %s", item.registry_number)
+
+
+def receipt_pdf_path(receipts: list[ReceiptData]) -> str:
+    key = receipt_key(receipts)
+    path = receipt_cache.get(key)
+    if path:
+        return path
+    return _render(key, receipts).result(timeout=RECEIPT_RENDER_TIMEOUT)
@@ -0,0 +1,58 @@
+import logging
+import re
+import time
+import uuid
+
+from config.logging_config import request_context
+
+logger = logging.getLogger("api.request")
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestContextMiddleware:
+    # Outermost middleware: gives every request an id (the caller's
+    # X-Request-ID when it looks sane), exposes it to all log lines written
+    # while the request runs and logs one line when it finishes.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        ctx = {"request_id": request_id, "user_id": None, "route": scope["path"]}
+        token = request_context.set(ctx)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # the route template once routing matched, so lines group per endpoint
+            route = scope.get("route")
+            if route is not None:
+                ctx["route"] = getattr(route, "path", ctx["route"])
+            logger.info(
+                "%s %s %s",
+                scope["method"],
+                ctx["route"],
+                status_code,
+                extra={
+                    "method": scope["method"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                },
+            )
+            request_context.reset(token)
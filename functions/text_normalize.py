@@ -0,0 +1,14 @@
+import re
+import unicodedata
+from typing import Optional
+
+_TRANSLITERATE = str.maketrans({"ł": "l", "Ł": "l", "ß": "ss"})
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.translate(_TRANSLITERATE))
+    value = "".join(c for c in value if not unicodedata.combining(c)).lower()
+    return _NON_WORD.sub(" ", value).strip()
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.config import SessionLocal
+from models.models import RefreshToken, RevokedToken
+
+TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "5"))
+# rows committed out of id/timestamp order are picked up by re-reading a short overlap
+TOKEN_REVOCATION_OVERLAP = timedelta(seconds=60)
+
+
+def new_token_id() -> str:
+    return str(uuid.uuid4())
+
+
+class RevocationFilter:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._revoked: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        self._since: Optional[datetime] = None
+
+    def _load(self) -> None:
+        now = datetime.now(timezone.utc)
+        query = select(RevokedToken.token_id, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        if self._since is not None:
+            query = query.where(RevokedToken.revoked_at >= self._since - TOKEN_REVOCATION_OVERLAP)
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(query).all()
+        finally:
+            db.close()
+
+        revoked = {k: v for k, v in self._revoked.items() if v > now}
+        revoked.update((token_id, expires_at) for token_id, expires_at in rows)
+        # readers never take the lock, so swap in a new dict instead of mutating
+        self._revoked = revoked
+        self._since = now
+
+    def refresh_if_stale(self) -> None:
+        if time.monotonic() < self._next_refresh:
+            return
+        if not self._lock.acquire(blocking=self._since is None):
+            return
+        try:
+            if time.monotonic() >= self._next_refresh:
+                self._load()
+                self._next_refresh = time.monotonic() + self.refresh_seconds
+        finally:
+            self._lock.release()
+
+    def add(self, token_id: str, expires_at: datetime) -> None:
+        with self._lock:
+            revoked = dict(self._revoked)
+            revoked[token_id] = expires_at
+            self._revoked = revoked
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        self.refresh_if_stale()
+        revoked = self._revoked
+        return payload.get("jti") in revoked or payload.get("fid") in revoked
+
+
+revocation_filter = RevocationFilter(TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+def _exp_datetime(payload: dict[str, Any]) -> datetime:
+    exp = payload.get("exp")
+    if exp is None:
+        return datetime.now(timezone.utc) + timedelta(days=1)
+    return datetime.fromtimestamp(exp, tz=timezone.utc)
+
+
+def revoke_token_id(db: Session, token_id: str, user_id: Optional[int], expires_at: datetime) -> None:
+    db.execute(
+        insert(RevokedToken)
+        .values(
+            token_id=token_id,
+            user_id=user_id,
+            revoked_at=datetime.now(timezone.utc),
+            expires_at=expires_at,
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedToken.token_id])
+    )
+    revocation_filter.add(token_id, expires_at)
+
+
+def revoke_family(db: Session, family_id: str, user_id: Optional[int]) -> None:
+    expires_at = db.execute(
+        select(func.max(RefreshToken.expires_at)).where(RefreshToken.family_id == family_id)
+    ).scalar()
+    revoke_token_id(db, family_id, user_id, expires_at or datetime.now(timezone.utc) + timedelta(days=1))
+
+
+def revoke_payload(db: Session, payload: dict[str, Any]) -> None:
+    user_id = payload.get("user_id")
+    if payload.get("jti"):
+        revoke_token_id(db, payload["jti"], user_id, _exp_datetime(payload))
+    if payload.get("fid"):
+        revoke_family(db, payload["fid"], user_id)
+
+
+def register_refresh_token(
+    db: Session,
+    jti: str,
+    family_id: str,
+    user_id: int,
+    expires_at: datetime,
+    parent_jti: Optional[str] = None,
+) -> None:
+    db.add(RefreshToken(
+        jti=jti,
+        family_id=family_id,
+        parent_jti=parent_jti,
+        user_id=user_id,
+        issued_at=datetime.now(timezone.utc),
+        expires_at=expires_at,
+    ))
+
+
+# Marks the refresh token as used. Returns False when it was already used
+# (or is unknown), in which case the caller must treat it as stolen.
+def consume_refresh_token(db: Session, jti: str) -> bool:
+    consumed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.used_at.is_(None))
+        .values(used_at=datetime.now(timezone.utc))
+        .returning(RefreshToken.jti)
+    ).first()
+    return consumed is not None
+
+
+def purge_expired_tokens(db: Session) -> tuple[int, int]:
+    now = datetime.now(timezone.utc)
+    refresh = db.execute(delete(RefreshToken).where(RefreshToken.expires_at < now)).rowcount
+    revoked = db.execute(delete(RevokedToken).where(RevokedToken.expires_at < now)).rowcount
+    db.commit()
+    return refresh, revoked
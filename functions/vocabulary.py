@@ -0,0 +1,228 @@
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from config.config import SessionLocal
+from functions.text_normalize import normalize
+from models.models import VocabularyAlias, VocabularyTerm
+
+VOCABULARY_REFRESH_SECONDS = float(os.getenv("VOCABULARY_REFRESH_SECONDS", "300"))
+# a miss on an id another worker just created triggers at most one reload per interval
+VOCABULARY_MISS_RELOAD_SECONDS = 5.0
+
+COLOR = "color"
+BRAND = "brand"
+
+COLOR_SEED: dict[str, tuple[str, ...]] = {
+    "czarny": ("black",),
+    "biały": ("white",),
+    "szary": ("grey", "gray", "popielaty"),
+    "srebrny": ("silver",),
+    "złoty": ("gold", "golden"),
+    "czerwony": ("red",),
+    "bordowy": ("burgundy", "maroon"),
+    "różowy": ("pink",),
+    "pomarańczowy": ("orange",),
+    "żółty": ("yellow",),
+    "zielony": ("green",),
+    "niebieski": ("blue",),
+    "granatowy": ("navy", "navy blue"),
+    "błękitny": ("light blue",),
+    "fioletowy": ("purple", "violet"),
+    "brązowy": ("brown",),
+    "beżowy": ("beige",),
+    "kolorowy": ("wielokolorowy", "multicolor", "multicolour"),
+    "przezroczysty": ("transparent", "clear"),
+}
+
+BRAND_SEED: dict[str, tuple[str, ...]] = {
+    "Apple": ("iphone",),
+    "Samsung": (),
+    "Xiaomi": ("redmi",),
+    "Huawei": (),
+    "Motorola": (),
+    "Nokia": (),
+    "Sony": (),
+    "LG": (),
+    "Lenovo": (),
+    "Dell": (),
+    "HP": ("hewlett packard",),
+    "Asus": (),
+    "Acer": (),
+    "Nike": (),
+    "Adidas": (),
+    "Puma": (),
+    "Reebok": (),
+    "Casio": (),
+    "Ray-Ban": ("rayban",),
+    "Wittchen": (),
+    "Samsonite": (),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _adjective_forms(name: str) -> tuple[str, ...]:
+    # czarny -> czarna, czarne; niebieski -> niebieska, niebieskie
+    if name.endswith("ki") or name.endswith("gi"):
+        return name[:-1] + "a", name[:-1] + "ie"
+    if name.endswith("y"):
+        return name[:-1] + "a", name[:-1] + "e"
+    return ()
+
+
+def _display_name(kind: str, raw: str) -> str:
+    value = _WHITESPACE.sub(" ", raw.strip())[:100]
+    return value.lower() if kind == COLOR else value
+
+
+def _create_term(kind: str, name: str, aliases) -> int:
+    # own short transaction: the term must survive an intake that is rolled back
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(VocabularyTerm).values(kind=kind, name=name).on_conflict_do_nothing(
+                index_elements=[VocabularyTerm.kind, VocabularyTerm.name]
+            )
+        )
+        term_id = db.execute(
+            select(VocabularyTerm.id).where(VocabularyTerm.kind == kind, VocabularyTerm.name == name)
+        ).scalar_one()
+
+        keys = {normalize(a) for a in (name, *aliases)} - {""}
+        if keys:
+            db.execute(
+                insert(VocabularyAlias)
+                .values([{"kind": kind, "alias": k[:100], "term_id": term_id} for k in sorted(keys)])
+                .on_conflict_do_nothing(index_elements=[VocabularyAlias.kind, VocabularyAlias.alias])
+            )
+        db.commit()
+
+        # a concurrent spelling may have claimed the alias first; the alias decides
+        return db.execute(
+            select(VocabularyAlias.term_id).where(
+                VocabularyAlias.kind == kind, VocabularyAlias.alias == normalize(name)[:100]
+            )
+        ).scalar() or term_id
+    finally:
+        db.close()
+
+
+def seed_vocabularies() -> None:
+    for name, aliases in COLOR_SEED.items():
+        _create_term(COLOR, name, aliases + _adjective_forms(name))
+    for name, aliases in BRAND_SEED.items():
+        _create_term(BRAND, name, aliases)
+
+
+class VocabularyCache:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._aliases: dict[tuple[str, str], int] = {}
+        self._names: dict[int, str] = {}
+        self._next_refresh = 0.0
+        self._last_miss_reload = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        db = SessionLocal()
+        try:
+            names = dict(db.execute(select(VocabularyTerm.id, VocabularyTerm.name)).all())
+            aliases = {
+                (kind, alias): term_id
+                for kind, alias, term_id in db.execute(
+                    select(VocabularyAlias.kind, VocabularyAlias.alias, VocabularyAlias.term_id)
+                ).all()
+            }
+        finally:
+            db.close()
+        # readers never take the lock, so swap in new dicts instead of mutating
+        self._names = names
+        self._aliases = aliases
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def refresh_if_stale(self) -> None:
+        if time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if time.monotonic() >= self._next_refresh:
+                self._load()
+
+    def lookup(self, kind: str, raw: Optional[str]) -> Optional[int]:
+        key = normalize(raw)[:100]
+        if not key:
+            return None
+        self.refresh_if_stale()
+        return self._aliases.get((kind, key))
+
+    # input -> canonical id, creating a new term for a spelling nobody used yet.
+    # Only for seeding and operator-run backfills, never straight from client input.
+    def resolve(self, kind: str, raw: Optional[str]) -> Optional[int]:
+        if not raw or not normalize(raw):
+            return None
+        term_id = self.lookup(kind, raw)
+        if term_id is not None:
+            return term_id
+
+        name = _display_name(kind, raw)
+        term_id = _create_term(kind, name, ())
+        with self._lock:
+            aliases = dict(self._aliases)
+            aliases[(kind, normalize(raw)[:100])] = term_id
+            names = dict(self._names)
+            names.setdefault(term_id, name)
+            self._aliases, self._names = aliases, names
+        return term_id
+
+    def name(self, term_id: Optional[int]) -> Optional[str]:
+        if term_id is None:
+            return None
+        self.refresh_if_stale()
+        name = self._names.get(term_id)
+        if name is None and time.monotonic() - self._last_miss_reload > VOCABULARY_MISS_RELOAD_SECONDS:
+            with self._lock:
+                self._last_miss_reload = time.monotonic()
+                self._load()
+            name = self._names.get(term_id)
+        return name
+
+
+vocabulary = VocabularyCache(VOCABULARY_REFRESH_SECONDS)
+
+
+def resolve_color(raw: Optional[str]) -> Optional[int]:
+    return vocabulary.resolve(COLOR, raw)
+
+
+def resolve_brand(raw: Optional[str]) -> Optional[int]:
+    return vocabulary.resolve(BRAND, raw)
+
+
+# Intake side: a known spelling becomes its id, anything else is kept as free
+# text with no id until someone adds it to the vocabulary and reruns
+# scripts/normalize_vocabularies.py.
+def match_term(kind: str, raw: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    if not raw or not normalize(raw):
+        return None, None
+    term_id = vocabulary.lookup(kind, raw)
+    if term_id is not None:
+        return term_id, None
+    return None, _display_name(kind, raw)
+
+
+def match_color(raw: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    return match_term(COLOR, raw)
+
+
+def match_brand(raw: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    return match_term(BRAND, raw)
+
+
+# rows written before the vocabularies existed still carry the free text
+def display_value(term_id: Optional[int], legacy: Optional[str] = None) -> Optional[str]:
+    return vocabulary.name(term_id) or legacy
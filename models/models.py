@@ -2,12 +2,16 @@ from typing import Optional, List
 import uuid
 
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, Table, Column, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, BigInteger, Boolean, DateTime, Float, LargeBinary, Table, Column, ForeignKey, func, event, DDL
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from config.config import Base
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, Sequence, UniqueConstraint
+
+
+# ids of live-feed events, shared by all workers
+found_item_events_seq = Sequence("found_item_events_seq", metadata=Base.metadata)
 
 
 starostwo_users = Table(
@@ -116,6 +120,43 @@ class CountyOffice(Base):
         nullable=True,
         index=True,
     )
+
+
+class VocabularyTerm(Base):
+    __tablename__ = "vocabulary_terms"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # "color" or "brand"
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "name", name="uq_vocabulary_terms_kind_name"),
+    )
+
+
+class VocabularyAlias(Base):
+    __tablename__ = "vocabulary_aliases"
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+
+    # normalized spelling: lower case, no diacritics or punctuation
+    alias: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    term_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("vocabulary_terms.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+# lifecycle of a found item; only the active ones are still on the shelf
+ITEM_STATUSES = ("registered", "stored", "claimed", "returned", "transferred", "disposed")
+ACTIVE_ITEM_STATUSES = ("registered", "stored", "claimed")
+
+
 class FoundItem(Base):
     __tablename__ = "found_items"
 
@@ -140,15 +181,30 @@ class FoundItem(Base):
         nullable=True
     )
 
+    # canonical colour/brand; the free-text columns above hold legacy rows and
+    # spellings the vocabulary does not know yet
+    item_color_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("vocabulary_terms.id"),
+        nullable=True,
+    )
+
+    item_brand_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("vocabulary_terms.id"),
+        nullable=True,
+    )
+
     found_location: Mapped[Optional[str]] = mapped_column(
         String(255),
         nullable=True
     )
 
-    found_date: Mapped[Optional[datetime]] = mapped_column(
+    # NOT NULL: the office listing keysets on (found_date, id)
+    found_date: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
-        nullable=True
+        nullable=False
     )
 
     found_time: Mapped[Optional[str]] = mapped_column(
@@ -212,6 +268,89 @@ class FoundItem(Base):
         index=True,
     )
 
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="registered",
+        server_default="registered",
+    )
+
+    status_changed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    # id of the last transaction that wrote the row, set by the
+    # found_items_change_seq trigger; drives the delta sync feed
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default="0",
+    )
+
+    # geocoded from found_location against the offline gazetteer
+    found_lat: Mapped[Optional[float]] = mapped_column(
+        Float,
+        nullable=True,
+    )
+
+    found_lon: Mapped[Optional[float]] = mapped_column(
+        Float,
+        nullable=True,
+    )
+
+
+Index("ix_found_items_user_created_at", FoundItem.user_id, FoundItem.created_at.desc())
+Index("ix_found_items_office_created_at", FoundItem.county_office_id, FoundItem.created_at.desc())
+# archive batches walk the oldest rows first
+Index("ix_found_items_created_at", FoundItem.created_at)
+Index(
+    "ix_found_items_office_found_date",
+    FoundItem.county_office_id,
+    FoundItem.found_date.desc(),
+    FoundItem.id.desc(),
+)
+Index(
+    "ix_found_items_office_color_id_found_date",
+    FoundItem.county_office_id,
+    FoundItem.item_color_id,
+    FoundItem.found_date.desc(),
+)
+Index(
+    "ix_found_items_office_brand_id_found_date",
+    FoundItem.county_office_id,
+    FoundItem.item_brand_id,
+    FoundItem.found_date.desc(),
+)
+Index(
+    "ix_found_items_office_location",
+    FoundItem.county_office_id,
+    FoundItem.found_location,
+    postgresql_ops={"found_location": "text_pattern_ops"},
+)
+# built-in GiST over point(lon, lat): no PostGIS needed for box/radius lookups
+Index(
+    "ix_found_items_found_point",
+    func.point(FoundItem.found_lon, FoundItem.found_lat),
+    postgresql_using="gist",
+    postgresql_where=FoundItem.found_lat.isnot(None),
+)
+Index("ix_found_items_user_change_seq", FoundItem.user_id, FoundItem.change_seq, FoundItem.id)
+# partial: shelf queries stay proportional to current stock, not all-time intake
+Index(
+    "ix_found_items_active_office_found_date",
+    FoundItem.county_office_id,
+    FoundItem.found_date.desc(),
+    FoundItem.id.desc(),
+    postgresql_where=FoundItem.status.in_(ACTIVE_ITEM_STATUSES),
+)
+Index(
+    "ix_found_items_active_office_status",
+    FoundItem.county_office_id,
+    FoundItem.status,
+    postgresql_where=FoundItem.status.in_(ACTIVE_ITEM_STATUSES),
+)
+
 class RegistryCounter(Base):
     __tablename__ = "registry_counters"
 
@@ -228,3 +367,337 @@ class RegistryCounter(Base):
         UniqueConstraint("county_office_id", "year", name="uq_registry_counter_office_year"),
     )
 
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    response_body: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+
+# txid_current() rather than a sequence: a sequence value is taken before
+# commit, so a reader could pass over a row that commits later with a lower
+# number. Transaction ids let the reader use its snapshot xmin as a safe horizon.
+FOUND_ITEMS_CHANGE_TRACKING_SQL = """
+CREATE OR REPLACE FUNCTION found_items_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := txid_current();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS found_items_change_seq ON found_items;
+CREATE TRIGGER found_items_change_seq
+    BEFORE INSERT OR UPDATE ON found_items
+    FOR EACH ROW EXECUTE FUNCTION found_items_change_seq();
+
+CREATE OR REPLACE FUNCTION found_items_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO found_item_tombstones (found_item_id, user_id, county_office_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.user_id, OLD.county_office_id, txid_current(), now())
+    ON CONFLICT (found_item_id) DO UPDATE
+        SET change_seq = EXCLUDED.change_seq, deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS found_items_tombstone ON found_items;
+CREATE TRIGGER found_items_tombstone
+    AFTER DELETE ON found_items
+    FOR EACH ROW EXECUTE FUNCTION found_items_tombstone();
+"""
+
+event.listen(FoundItem.__table__, "after_create", DDL(FOUND_ITEMS_CHANGE_TRACKING_SQL))
+
+
+# Deleted (or archived) found items, kept for SYNC_TOMBSTONE_RETENTION_DAYS so
+# offline clients learn about the removal on their next delta sync.
+class FoundItemTombstone(Base):
+    __tablename__ = "found_item_tombstones"
+
+    found_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    county_office_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+    )
+
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (
+        Index("ix_found_item_tombstones_user_change_seq", "user_id", "change_seq", "found_item_id"),
+    )
+
+
+class FoundItemArchive(Base):
+    __tablename__ = "found_items_archive"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+
+    registry_number: Mapped[Optional[str]] = mapped_column(
+        String(32),
+        nullable=True,
+        unique=True,
+        index=True,
+    )
+
+    county_office_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+        index=True,
+    )
+
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    # zlib-compressed JSON of the full found_items row
+    payload: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+    )
+
+
+class PhotoBlob(Base):
+    __tablename__ = "photo_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    variants_ready: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+
+class FoundItemPhoto(Base):
+    __tablename__ = "found_item_photos"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    # no foreign key: found_items may be partitioned, and then (id) alone is not unique
+    found_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        index=True,
+    )
+
+    content_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("photo_blobs.content_hash"),
+        nullable=False,
+    )
+
+    blob: Mapped["PhotoBlob"] = relationship("PhotoBlob", lazy="joined")
+
+    uploaded_by: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    # the same file uploaded twice to one item is one photo
+    __table_args__ = (
+        UniqueConstraint("found_item_id", "content_hash", name="uq_found_item_photos_item_hash"),
+    )
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti: Mapped[str] = mapped_column(String(36), primary_key=True)
+
+    family_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+
+    parent_jti: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    # either a single token jti or a whole refresh-token family id
+    token_id: Mapped[str] = mapped_column(String(36), nullable=False, unique=True)
+
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class FoundItemStatusChange(Base):
+    __tablename__ = "found_item_status_history"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    # no foreign key: found_items may be partitioned, and then (id) alone is not unique
+    found_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+
+    from_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    to_status: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    changed_by: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    note: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    __table_args__ = (
+        Index("ix_found_item_status_history_item_changed_at", "found_item_id", "changed_at"),
+    )
+
+
+# Append-only: written in batches by functions.pii_audit, never changed.
+PII_ACCESS_LOG_APPEND_ONLY_SQL = """
+CREATE OR REPLACE FUNCTION pii_access_log_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'pii_access_log is append-only';
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pii_access_log_append_only ON pii_access_log;
+CREATE TRIGGER pii_access_log_append_only
+    BEFORE UPDATE OR DELETE ON pii_access_log
+    FOR EACH ROW EXECUTE FUNCTION pii_access_log_append_only();
+"""
+
+
+class PiiAccessEvent(Base):
+    __tablename__ = "pii_access_log"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    # no foreign keys: the trail must outlive archived items and deleted users
+    found_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    action: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    route: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    request_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_pii_access_log_item_accessed_at", "found_item_id", "accessed_at", "id"),
+        Index("ix_pii_access_log_user_accessed_at", "user_id", "accessed_at", "id"),
+    )
+
+
+event.listen(PiiAccessEvent.__table__, "after_create", DDL(PII_ACCESS_LOG_APPEND_ONLY_SQL))
@@ -0,0 +1,14 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class CountyOfficeResponse(BaseModel):
+    id: str
+    code: str
+    county_name: str
+    county_code: Optional[str] = None
+    voivodeship_name: Optional[str] = None
+    voivodeship_code: Optional[str] = None
+
+    class Config:
+        from_attributes = True
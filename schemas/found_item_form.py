@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 
@@ -14,6 +14,8 @@ class FoundItemFormRequest(BaseModel):
     found_by_firstname: Optional[str] = None
     found_by_lastname: Optional[str] = None
     found_by_phonenumber: Optional[str] = None
+    # set after the client has seen the likely duplicates and still wants a new entry
+    confirm_duplicate: bool = False
 
     @field_validator("item_color", "item_brand", "found_time", "circumstances", "found_location", "found_by_firstname", "found_by_lastname", "found_by_phonenumber", mode="before")
     @classmethod
@@ -46,6 +48,61 @@ class FoundItemFormResponse(BaseModel):
     found_by_lastname: Optional[str] = None
     found_by_phonenumber: Optional[str] = None
     created_at: datetime
+    status: Optional[str] = None
+    status_changed_at: Optional[datetime] = None
+    found_lat: Optional[float] = None
+    found_lon: Optional[float] = None
 
     class Config:
         from_attributes = True
+
+
+class FoundItemBatchRequest(BaseModel):
+    # item ids or registry numbers, mixed freely
+    keys: List[str] = Field(..., min_length=1, max_length=200)
+
+
+class FoundItemBatchEntry(BaseModel):
+    key: str
+    found: bool
+    item: Optional[FoundItemFormResponse] = None
+
+
+class FoundItemBatchResponse(BaseModel):
+    results: List[FoundItemBatchEntry]
+
+
+class FoundItemSyncPage(BaseModel):
+    changed: List[FoundItemFormResponse]
+    deleted: List[str]
+    next_token: str
+    has_more: bool
+
+
+class FoundItemFormPage(BaseModel):
+    items: List[FoundItemFormResponse]
+    next_cursor: Optional[str] = None
+    total: int
+    total_is_estimate: bool
+
+
+class DuplicateCandidateResponse(BaseModel):
+    id: str
+    registry_number: Optional[str] = None
+    item_name: str
+    item_color: Optional[str] = None
+    item_brand: Optional[str] = None
+    found_location: Optional[str] = None
+    found_date: Optional[datetime] = None
+    similarity: float
+
+
+class FoundItemMapPoint(BaseModel):
+    id: str
+    registry_number: Optional[str] = None
+    item_name: str
+    status: Optional[str] = None
+    found_date: Optional[datetime] = None
+    lat: float
+    lon: float
+    distance_m: Optional[float] = None
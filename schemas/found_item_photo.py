@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class FoundItemPhotoResponse(BaseModel):
+    id: str
+    found_item_id: str
+    content_hash: str
+    content_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants_ready: bool
+    original_url: str
+    thumbnail_url: str
+    medium_url: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
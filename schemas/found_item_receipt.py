@@ -0,0 +1,13 @@
+from typing import List
+from pydantic import BaseModel, Field, field_validator
+
+
+class ReceiptBatchRequest(BaseModel):
+    registry_numbers: List[str] = Field(..., min_length=1, max_length=200)
+
+    @field_validator("registry_numbers", mode="before")
+    @classmethod
+    def normalize_registry_numbers(cls, v):
+        if isinstance(v, list):
+            return [n.strip().upper() if isinstance(n, str) else n for n in v]
+        return v
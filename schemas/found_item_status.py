@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+class FoundItemStatusRequest(BaseModel):
+    status: str = Field(..., min_length=1, max_length=20)
+    note: Optional[str] = Field(None, max_length=500)
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def normalize_status(cls, v):
+        if isinstance(v, str):
+            return v.strip().lower()
+        return v
+
+
+class FoundItemStatusChangeResponse(BaseModel):
+    from_status: Optional[str] = None
+    to_status: str
+    changed_by: Optional[int] = None
+    changed_at: datetime
+    note: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class PiiAccessEventResponse(BaseModel):
+    id: int
+    found_item_id: str
+    user_id: Optional[int] = None
+    action: str
+    route: Optional[str] = None
+    request_id: Optional[str] = None
+    accessed_at: datetime
+
+
+class PiiAccessEventPage(BaseModel):
+    items: List[PiiAccessEventResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,35 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+from models.models import FOUND_ITEMS_CHANGE_TRACKING_SQL, FoundItemTombstone
+from scripts.create_missing_indexes import create_missing_indexes
+
+def add_change_tracking():
+    print("Adding change_seq, tombstones and change tracking triggers to found_items...")
+
+    with engine.begin() as conn:
+        try:
+            # existing rows keep 0: a full sync (since 0) still returns them
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 0;
+            """))
+
+            FoundItemTombstone.__table__.create(conn, checkfirst=True)
+            conn.execute(text(FOUND_ITEMS_CHANGE_TRACKING_SQL))
+
+            print("Change tracking installed successfully!")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise
+
+    create_missing_indexes()
+
+if __name__ == "__main__":
+    add_change_tracking()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+from scripts.create_missing_indexes import create_missing_indexes
+
+def add_columns():
+    print("Adding found_lat and found_lon columns to found_items table...")
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ADD COLUMN IF NOT EXISTS found_lat DOUBLE PRECISION;
+            """))
+
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ADD COLUMN IF NOT EXISTS found_lon DOUBLE PRECISION;
+            """))
+
+            print("Columns added successfully!")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise
+
+    create_missing_indexes()
+
+if __name__ == "__main__":
+    add_columns()
@@ -0,0 +1,36 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+from scripts.create_missing_indexes import create_missing_indexes
+
+def add_columns():
+    print("Adding status and status_changed_at columns to found_items table...")
+
+    with engine.begin() as conn:
+        try:
+            # constant default: no table rewrite, existing items start as registered
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'registered';
+            """))
+
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ADD COLUMN IF NOT EXISTS status_changed_at TIMESTAMP WITH TIME ZONE;
+            """))
+
+            print("Columns added successfully!")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise
+
+    create_missing_indexes()
+
+if __name__ == "__main__":
+    add_columns()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+
+def add_constraint():
+    print("Adding unique (found_item_id, content_hash) to found_item_photos...")
+
+    with engine.begin() as conn:
+        try:
+            exists = conn.execute(text("""
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_found_item_photos_item_hash';
+            """)).scalar()
+            if exists:
+                print("Constraint already exists")
+                return
+
+            # concurrent uploads may already have stored the same file twice: keep the first
+            removed = conn.execute(text("""
+                DELETE FROM found_item_photos p
+                USING found_item_photos older
+                WHERE older.found_item_id = p.found_item_id
+                  AND older.content_hash = p.content_hash
+                  AND (older.created_at, older.id) < (p.created_at, p.id);
+            """)).rowcount
+            print(f"Removed {removed} duplicate photos")
+
+            conn.execute(text("""
+                ALTER TABLE found_item_photos
+                ADD CONSTRAINT uq_found_item_photos_item_hash UNIQUE (found_item_id, content_hash);
+            """))
+
+            print("Constraint added successfully!")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise
+
+if __name__ == "__main__":
+    add_constraint()
@@ -0,0 +1,22 @@
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.archive import ARCHIVE_RETENTION_DAYS, run_archival
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move found items past the retention age into found_items_archive")
+    parser.add_argument("--retention-days", type=int, default=ARCHIVE_RETENTION_DAYS)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    total = run_archival(SessionLocal, args.retention_days, args.max_batches)
+    print(f"Archived {total} found items")
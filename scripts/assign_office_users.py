@@ -0,0 +1,48 @@
+import argparse
+import csv
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.county_offices import assign_users
+
+
+def read_pairs(path: str) -> list[tuple[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = ";" if sample.count(";") > sample.count(",") else ","
+        return [
+            (row["email"], row["office_code"])
+            for row in csv.DictReader(f, delimiter=delimiter)
+            if row.get("email") and row.get("office_code")
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign users to county offices in bulk (starostwo_users)")
+    parser.add_argument("path", nargs="?", help="CSV with email and office_code columns")
+    parser.add_argument("--email")
+    parser.add_argument("--code", help="office code, e.g. 0403")
+    parser.add_argument("--replace", action="store_true", help="drop the users' other office assignments")
+    args = parser.parse_args()
+
+    pairs = read_pairs(args.path) if args.path else []
+    if args.email and args.code:
+        pairs.append((args.email, args.code))
+    if not pairs:
+        parser.error("give a CSV file or --email and --code")
+
+    db = SessionLocal()
+    try:
+        missing = assign_users(db, pairs, replace=args.replace)
+    finally:
+        db.close()
+
+    for email, code in missing:
+        print(f"Skipped {email} -> {code}: unknown user or office")
+    print(f"finished: {len(pairs) - len(missing)} assignments")
@@ -0,0 +1,79 @@
+import argparse
+import itertools
+import os
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import func
+from config.config import SessionLocal
+from functions.offices import OfficeItemFilters, office_items_query
+from functions.query_plans import SEQ_SCAN_MIN_ROWS, explain, seq_scanned_tables
+from models.models import FoundItem
+
+SAMPLE_FILTERS = {
+    "date_from": date.today() - timedelta(days=30),
+    "date_to": date.today(),
+    "color": "czarny",
+    "brand": "Samsung",
+    "location_prefix": "Dworzec",
+    "registry_number": "RZ25XX0001",
+    "status": "stored",
+    "active_only": True,
+}
+
+
+# Plans every combination of the office listing filters with the planner's normal
+# settings: at a realistic table size a seq scan on found_items means no index
+# serves that combination well enough.
+def check_office_listing_plans(office_id=None) -> list[str]:
+    failures = []
+    db = SessionLocal()
+    try:
+        rows = db.query(func.count(FoundItem.id)).scalar()
+        if rows < SEQ_SCAN_MIN_ROWS:
+            raise SystemExit(
+                f"Only {rows} found items: below {SEQ_SCAN_MIN_ROWS} a seq scan can be the right plan, "
+                "load more with scripts/generate_synthetic_data.py"
+            )
+
+        if office_id is None:
+            office_id = db.query(FoundItem.county_office_id).filter(
+                FoundItem.county_office_id.isnot(None)
+            ).group_by(FoundItem.county_office_id).order_by(func.count().desc()).limit(1).scalar()
+        if office_id is None:
+            raise SystemExit("No found items with a county office to plan against")
+
+        names = list(SAMPLE_FILTERS)
+        for size in range(len(names) + 1):
+            for combo in itertools.combinations(names, size):
+                filters = OfficeItemFilters(**{name: SAMPLE_FILTERS[name] for name in combo})
+                query = office_items_query(db, office_id, filters).order_by(
+                    FoundItem.found_date.desc(), FoundItem.id.desc()
+                ).limit(50)
+
+                plan = explain(db, query)
+
+                scanned = sorted(t for t in seq_scanned_tables(plan) if t and t.startswith("found_items"))
+                label = ", ".join(combo) or "(no filters)"
+                if scanned:
+                    failures.append(f"{label}: seq scan on {', '.join(scanned)}")
+                print(f"{'FAIL' if scanned else 'ok  '} {label}")
+    finally:
+        db.close()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if an office listing filter combination needs a sequential scan")
+    parser.add_argument("--office-id", default=None)
+    args = parser.parse_args()
+
+    failures = check_office_listing_plans(args.office_id)
+    if failures:
+        print("\n".join(failures))
+        sys.exit(1)
+    print("finished")
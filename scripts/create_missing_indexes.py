@@ -0,0 +1,50 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+from config.config import Base, engine
+from functions.partitions import is_partitioned
+
+import models.models  # noqa: F401  registers every table on Base.metadata
+
+
+# create_all() only creates missing tables, so indexes added to existing tables
+# in models.py are created here. CONCURRENTLY keeps intake running meanwhile;
+# a partitioned parent does not support it and gets a plain CREATE INDEX.
+def create_missing_indexes():
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            partitioned = is_partitioned(conn, table.name)
+
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name in existing:
+                    continue
+
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+                if not partitioned:
+                    ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                    ddl = ddl.replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX CONCURRENTLY", 1)
+                elif index.unique:
+                    print(f"Skipping unique index {index.name} on partitioned {table.name}")
+                    continue
+
+                print(f"Creating {index.name}...")
+                conn.exec_driver_sql(ddl)
+
+    print("finished")
+
+
+if __name__ == "__main__":
+    create_missing_indexes()
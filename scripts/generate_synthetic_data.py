@@ -0,0 +1,274 @@
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from config.config import Base, engine
+from functions.partitions import create_year_partition, is_partitioned
+from functions.vocabulary import BRAND, BRAND_SEED, COLOR, COLOR_SEED, seed_vocabularies
+from models.models import (
+    ACTIVE_ITEM_STATUSES,
+    CountyOffice,
+    RegistryCounter,
+    User,
+    VocabularyTerm,
+    starostwo_users,
+)
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.invalid"
+COPY_CHUNK_ROWS = 50_000
+YEARS_OF_HISTORY = 3
+
+# (name, weight): phones, wallets, keys and documents dominate real intake
+ITEM_KINDS = [
+    ("telefon komórkowy", 18), ("portfel", 16), ("klucze", 14), ("dowód osobisty", 9),
+    ("plecak", 7), ("parasol", 6), ("okulary", 5), ("słuchawki", 5), ("torebka", 4),
+    ("rower", 3), ("zegarek", 3), ("kurtka", 3), ("biżuteria", 2), ("laptop", 2),
+    ("hulajnoga", 1), ("aparat fotograficzny", 1), ("rękawiczki", 1),
+]
+PLACES = [
+    "Dworzec PKP", "Dworzec autobusowy", "Rynek", "Galeria handlowa", "Park miejski",
+    "Przystanek tramwajowy", "Szpital wojewódzki", "Urząd miasta", "Plac zabaw", "Stadion",
+    "ul. Mickiewicza", "ul. Kościuszki", "ul. Sienkiewicza", "ul. Słowackiego", "ul. Piłsudskiego",
+]
+FIRST_NAMES = ["Anna", "Piotr", "Katarzyna", "Krzysztof", "Maria", "Tomasz", "Agnieszka", "Paweł", "Ewa", "Michał"]
+LAST_NAMES = ["Nowak", "Kowalski", "Wiśniewska", "Wójcik", "Kamińska", "Lewandowski", "Zielińska", "Szymański"]
+
+FOUND_ITEM_COLUMNS = [
+    "id", "item_name", "item_color_id", "item_brand_id", "found_location", "found_date", "found_time",
+    "circumstances", "created_at", "found_by_firstname", "found_by_lastname", "found_by_phonenumber",
+    "user_id", "county_office_id", "registry_number", "status", "status_changed_at", "found_lat", "found_lon",
+]
+
+
+def _copy(raw_conn, table: str, columns: list[str], rows) -> int:
+    count = 0
+    cursor = raw_conn.cursor()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if v is None else v for v in row])
+            count += 1
+            if count % COPY_CHUNK_ROWS == 0:
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    return count
+
+
+def ensure_offices_and_users(conn, rng: random.Random, offices: int, users_per_office: int) -> None:
+    existing = conn.execute(select(func.count()).select_from(CountyOffice)).scalar()
+    if existing >= offices:
+        return
+
+    rows = []
+    for i in range(existing, offices):
+        woj, pow_ = 2 * (i % 16 + 1), i // 16 + 1
+        code = f"{woj:02d}{pow_:02d}"
+        rows.append({
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "county_name": f"Starostwo Powiatowe {code}",
+            "code": code,
+            "county_code": code,
+            "voivodeship_code": f"{woj:02d}",
+            "voivodeship_name": f"województwo {woj:02d}",
+        })
+    # a code that already exists (a real office, with --allow-real-data) is
+    # skipped: only offices created here get synthetic members
+    rows = conn.execute(
+        insert(CountyOffice).values(rows)
+        .on_conflict_do_nothing(index_elements=[CountyOffice.code])
+        .returning(CountyOffice.id, CountyOffice.code)
+    ).mappings().all()
+    if not rows:
+        return
+
+    # "!" is not a valid argon2 hash: synthetic accounts can never log in
+    user_rows = [
+        {
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "email": f"{office['code']}-{n}@{SYNTHETIC_EMAIL_DOMAIN}",
+            "hashed_password": "!",
+        }
+        for office in rows
+        for n in range(users_per_office)
+    ]
+    conn.execute(insert(User).values(user_rows).on_conflict_do_nothing(index_elements=[User.email]))
+
+    ids = dict(conn.execute(
+        select(User.email, User.id).where(User.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}"))
+    ).all())
+    conn.execute(
+        insert(starostwo_users)
+        .values([
+            {"county_office_id": office["id"], "user_id": ids[f"{office['code']}-{n}@{SYNTHETIC_EMAIL_DOMAIN}"]}
+            for office in rows
+            for n in range(users_per_office)
+        ])
+        .on_conflict_do_nothing()
+    )
+
+
+def _office_weights(count: int) -> list[float]:
+    # Zipf-like: a few city powiats take most of the intake
+    return [1.0 / (rank ** 1.1) for rank in range(1, count + 1)]
+
+
+# Appends: calling it again with another seed grows the same dataset, which is
+# how the scale harness goes from 10k to 1M rows without reloading.
+def generate_found_items(count: int, seed: int = 42, offices: int = 380, users_per_office: int = 3) -> int:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    Base.metadata.create_all(engine)
+    seed_vocabularies()
+
+    with engine.begin() as conn:
+        ensure_offices_and_users(conn, rng, offices, users_per_office)
+
+        office_rows = conn.execute(
+            select(CountyOffice.id, CountyOffice.code).order_by(CountyOffice.code).limit(offices)
+        ).all()
+        members: dict[uuid.UUID, list[int]] = {}
+        for office_id, user_id in conn.execute(
+            select(starostwo_users.c.county_office_id, starostwo_users.c.user_id)
+        ).all():
+            members.setdefault(office_id, []).append(user_id)
+        office_rows = [o for o in office_rows if members.get(o.id)]
+
+        colors = conn.execute(
+            select(VocabularyTerm.id).where(VocabularyTerm.kind == COLOR, VocabularyTerm.name.in_(COLOR_SEED))
+        ).scalars().all()
+        brands = conn.execute(
+            select(VocabularyTerm.id).where(VocabularyTerm.kind == BRAND, VocabularyTerm.name.in_(BRAND_SEED))
+        ).scalars().all()
+
+        # numbering continues where earlier runs stopped
+        counters = {
+            (office_id, year): value
+            for office_id, year, value in conn.execute(
+                select(RegistryCounter.county_office_id, RegistryCounter.year, RegistryCounter.value)
+            ).all()
+        }
+
+        if is_partitioned(conn):
+            for year in range(now.year - YEARS_OF_HISTORY, now.year + 2):
+                create_year_partition(conn, year)
+
+    office_weights = list(itertools.accumulate(_office_weights(len(office_rows))))
+    kinds, kind_weights = zip(*ITEM_KINDS)
+    kind_weights = list(itertools.accumulate(kind_weights))
+    # each office sits somewhere in Poland, the same spot on every run; its
+    # items scatter a few km around it
+    centres = {}
+    for o in office_rows:
+        spot = random.Random(o.code)
+        centres[o.id] = (spot.uniform(49.2, 54.6), spot.uniform(14.3, 23.9))
+
+    def rows():
+        for _ in range(count):
+            office = rng.choices(office_rows, cum_weights=office_weights)[0]
+            age_days = min(rng.expovariate(1 / 200), YEARS_OF_HISTORY * 365 - 1)
+            found_date = (now - timedelta(days=age_days)).replace(tzinfo=None, second=0, microsecond=0)
+            created_at = now - timedelta(days=max(age_days - rng.uniform(0, 5), 0))
+
+            key = (office.id, created_at.year)
+            counters[key] = counters.get(key, 0) + 1
+
+            # old items have mostly left the shelf
+            if age_days < 30:
+                status = rng.choice(ACTIVE_ITEM_STATUSES)
+            elif age_days < 730:
+                status = rng.choices(["stored", "claimed", "returned", "transferred"], weights=[30, 5, 55, 10])[0]
+            else:
+                status = rng.choices(["returned", "transferred", "disposed"], weights=[50, 35, 15])[0]
+
+            lat = lon = None
+            if rng.random() < 0.6:
+                lat = round(centres[office.id][0] + rng.gauss(0, 0.03), 6)
+                lon = round(centres[office.id][1] + rng.gauss(0, 0.05), 6)
+
+            has_finder = rng.random() < 0.7
+            yield [
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                rng.choices(kinds, cum_weights=kind_weights)[0],
+                rng.choice(colors) if colors and rng.random() < 0.8 else None,
+                rng.choice(brands) if brands and rng.random() < 0.4 else None,
+                rng.choice(PLACES),
+                found_date.isoformat(sep=" "),
+                found_date.strftime("%H:%M"),
+                None,
+                created_at.isoformat(sep=" "),
+                rng.choice(FIRST_NAMES) if has_finder else None,
+                rng.choice(LAST_NAMES) if has_finder else None,
+                f"+48{rng.randint(500000000, 899999999)}" if has_finder else None,
+                rng.choice(members[office.id]),
+                office.id,
+                f"RZ{str(created_at.year)[-2:]}{office.code}{counters[key]:04d}",
+                status,
+                None if status == "registered" else created_at.isoformat(sep=" "),
+                lat,
+                lon,
+            ]
+
+    raw = engine.raw_connection()
+    try:
+        written = _copy(raw, "found_items", FOUND_ITEM_COLUMNS, rows())
+        raw.commit()
+    finally:
+        raw.close()
+
+    with engine.begin() as conn:
+        if counters:
+            stmt = insert(RegistryCounter).values(
+                [{"county_office_id": o, "year": y, "value": v} for (o, y), v in counters.items()]
+            )
+            conn.execute(stmt.on_conflict_do_update(
+                constraint="uq_registry_counter_office_year",
+                set_={"value": func.greatest(RegistryCounter.value, stmt.excluded.value)},
+            ))
+        conn.execute(text("ANALYZE found_items"))
+    return written
+
+
+def is_synthetic_database(conn) -> bool:
+    foreign = conn.execute(
+        select(func.count()).select_from(User).where(~User.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}"))
+    ).scalar()
+    return not foreign
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load synthetic users, offices and found items via COPY")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--offices", type=int, default=380)
+    parser.add_argument("--users-per-office", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--allow-real-data", action="store_true", help="run even though non-synthetic users exist")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if not args.allow_real_data and not is_synthetic_database(conn):
+            raise SystemExit(f"{engine.url.render_as_string()} holds real users; point DATABASE_URL at a scratch database")
+
+    written = generate_found_items(args.items, args.seed, args.offices, args.users_per_office)
+    print(f"finished: {written} found items")
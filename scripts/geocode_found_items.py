@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import bindparam, select, update
+from config.config import SessionLocal
+from functions.geocoding import GAZETTEER_PATH, gazetteer, geocode_location
+from models.models import CountyOffice, FoundItem
+
+found_items = FoundItem.__table__
+
+
+# Walks rows without coordinates in id order, one short transaction per batch,
+# so it can run next to live intake and be resumed or re-run after the
+# gazetteer file has been extended.
+def backfill(batch_size: int) -> tuple[int, int]:
+    scanned = geocoded = 0
+    last_id = None
+
+    while True:
+        db = SessionLocal()
+        try:
+            query = (
+                select(FoundItem.id, FoundItem.found_location, CountyOffice.county_code)
+                .outerjoin(CountyOffice, CountyOffice.id == FoundItem.county_office_id)
+                .where(FoundItem.found_lat.is_(None), FoundItem.found_location.isnot(None))
+                .order_by(FoundItem.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.where(FoundItem.id > last_id)
+            rows = db.execute(query).all()
+            if not rows:
+                break
+
+            updates = []
+            for item_id, location, county_code in rows:
+                coordinates = geocode_location(location, county_code)
+                if coordinates:
+                    updates.append({"item_id": item_id, "lat": coordinates[0], "lon": coordinates[1]})
+
+            if updates:
+                db.execute(
+                    update(found_items)
+                    .where(found_items.c.id == bindparam("item_id"), found_items.c.found_lat.is_(None))
+                    .values(found_lat=bindparam("lat"), found_lon=bindparam("lon")),
+                    updates,
+                )
+                db.commit()
+
+            scanned += len(rows)
+            geocoded += len(updates)
+            last_id = rows[-1][0]
+            print(f"scanned {scanned}, geocoded {geocoded}")
+        finally:
+            db.close()
+
+    return scanned, geocoded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geocode found_location of existing found items against the gazetteer")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # without place names only literal coordinates match: scanning would change nothing
+    if not gazetteer.places:
+        raise SystemExit(f"Gazetteer {GAZETTEER_PATH} is missing or empty, see data/README.md")
+
+    scanned, geocoded = backfill(args.batch_size)
+    print(f"finished: geocoded {geocoded} of {scanned} items")
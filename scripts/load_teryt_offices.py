@@ -0,0 +1,28 @@
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.county_offices import office_rows, read_teryt, upsert_offices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load every powiat from a TERYT TERC file (CSV or XML) into county_offices")
+    parser.add_argument("path", help="TERC_Urzedowy_*.csv or .xml downloaded from eteryt.stat.gov.pl")
+    parser.add_argument("--update-names", action="store_true", help="overwrite county_name of existing offices")
+    args = parser.parse_args()
+
+    rows = office_rows(read_teryt(args.path))
+    voivodeships = {r["voivodeship_code"] for r in rows}
+    print(f"Read {len(rows)} powiats in {len(voivodeships)} voivodeships")
+
+    db = SessionLocal()
+    try:
+        upsert_offices(db, rows, update_names=args.update_names)
+    finally:
+        db.close()
+    print("finished")
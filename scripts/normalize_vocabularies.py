@@ -0,0 +1,120 @@
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import bindparam, or_, select, text, update
+from config.config import Base, SessionLocal, engine
+from functions.vocabulary import match_brand, match_color, resolve_brand, resolve_color, seed_vocabularies
+from models.models import FoundItem, VocabularyAlias, VocabularyTerm
+from scripts.create_missing_indexes import create_missing_indexes
+
+found_items = FoundItem.__table__
+
+
+def add_columns():
+    print("Adding item_color_id and item_brand_id columns to found_items table...")
+    Base.metadata.create_all(engine, tables=[VocabularyTerm.__table__, VocabularyAlias.__table__])
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE found_items
+            ADD COLUMN IF NOT EXISTS item_color_id INTEGER REFERENCES vocabulary_terms(id);
+        """))
+
+        conn.execute(text("""
+            ALTER TABLE found_items
+            ADD COLUMN IF NOT EXISTS item_brand_id INTEGER REFERENCES vocabulary_terms(id);
+        """))
+
+
+def _map(match, resolve, raw, current_id, create_terms: bool, keep_text: bool):
+    if raw is None:
+        # mapped by an earlier run, or never set
+        return current_id, None
+    term_id = resolve(raw) if create_terms else match(raw)[0]
+    return term_id, raw if keep_text or term_id is None else None
+
+
+# One pass in id order, one short transaction per batch. Distinct spellings are
+# resolved through the in-memory vocabulary, so each one hits the database once.
+# Without create_terms only spellings the vocabulary knows get an id; the rest
+# stay free text, so rerun this after adding terms or aliases.
+def backfill(batch_size: int, keep_text: bool, create_terms: bool) -> int:
+    done = 0
+    last_id = None
+
+    while True:
+        db = SessionLocal()
+        try:
+            query = (
+                select(
+                    FoundItem.id, FoundItem.item_color, FoundItem.item_brand,
+                    FoundItem.item_color_id, FoundItem.item_brand_id,
+                )
+                .where(or_(FoundItem.item_color.isnot(None), FoundItem.item_brand.isnot(None)))
+                .order_by(FoundItem.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.where(FoundItem.id > last_id)
+            rows = db.execute(query).all()
+            if not rows:
+                break
+
+            params = []
+            for item_id, color, brand, current_color_id, current_brand_id in rows:
+                color_id, color_text = _map(match_color, resolve_color, color, current_color_id, create_terms, keep_text)
+                brand_id, brand_text = _map(match_brand, resolve_brand, brand, current_brand_id, create_terms, keep_text)
+                params.append({
+                    "item_id": item_id,
+                    "color_id": color_id,
+                    "color_text": color_text,
+                    "brand_id": brand_id,
+                    "brand_text": brand_text,
+                })
+
+            db.execute(
+                update(found_items)
+                .where(found_items.c.id == bindparam("item_id"))
+                .values(
+                    item_color_id=bindparam("color_id"),
+                    item_color=bindparam("color_text"),
+                    item_brand_id=bindparam("brand_id"),
+                    item_brand=bindparam("brand_text"),
+                ),
+                params,
+            )
+            db.commit()
+
+            done += len(rows)
+            last_id = rows[-1][0]
+            print(f"normalized {done}")
+        finally:
+            db.close()
+
+    return done
+
+
+def drop_text_indexes():
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_found_items_office_color_found_date"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_found_items_office_brand_found_date"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map free-text colours and brands onto the vocabulary tables")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep-text", action="store_true", help="leave the legacy free-text columns filled in")
+    parser.add_argument("--create-terms", action="store_true", help="add every unknown spelling as a new term")
+    args = parser.parse_args()
+
+    add_columns()
+    seed_vocabularies()
+    total = backfill(args.batch_size, args.keep_text, args.create_terms)
+    create_missing_indexes()
+    drop_text_indexes()
+    print(f"finished: {total} found items normalized")
@@ -0,0 +1,161 @@
+import argparse
+import os
+import re
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+from functions.partitions import (
+    FOUND_ITEMS_OFFICE_PARTITIONS,
+    FOUND_ITEMS_PARTITION_YEARS_AHEAD,
+    create_year_partition,
+    is_partitioned,
+)
+
+# A partitioned table can only enforce uniqueness on columns that include the
+# partition key, so the global registry_number guarantee moves to this table,
+# kept in sync by a trigger. Numbers are never released, also not on delete.
+REGISTRY_NUMBERS_SQL = """
+CREATE TABLE IF NOT EXISTS registry_numbers (
+    registry_number VARCHAR(32) PRIMARY KEY,
+    found_item_id UUID NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION found_items_reserve_registry_number() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.registry_number IS NOT DISTINCT FROM OLD.registry_number THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.registry_number IS NOT NULL THEN
+        DELETE FROM registry_numbers WHERE registry_number = OLD.registry_number;
+    END IF;
+    IF NEW.registry_number IS NOT NULL THEN
+        INSERT INTO registry_numbers (registry_number, found_item_id, created_at)
+        VALUES (NEW.registry_number, NEW.id, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS found_items_reserve_registry_number ON found_items;
+CREATE TRIGGER found_items_reserve_registry_number
+    AFTER INSERT OR UPDATE OF registry_number ON found_items
+    FOR EACH ROW EXECUTE FUNCTION found_items_reserve_registry_number();
+"""
+
+
+def _index_definitions(conn):
+    rows = conn.execute(text("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        JOIN pg_class c ON c.relname = i.indexname
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.tablename = 'found_items' AND NOT x.indisprimary
+    """)).all()
+
+    definitions = []
+    for name, indexdef in rows:
+        # uniqueness is enforced by registry_numbers, not by the partitioned index
+        indexdef = re.sub(r"^CREATE UNIQUE INDEX", "CREATE INDEX", indexdef)
+        definitions.append((name, indexdef))
+    return definitions
+
+
+def _foreign_keys(conn):
+    return conn.execute(text("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = 'found_items'::regclass AND contype = 'f'
+    """)).all()
+
+
+def _triggers(conn):
+    return conn.execute(text("""
+        SELECT tgname, pg_get_triggerdef(oid)
+        FROM pg_trigger
+        WHERE tgrelid = 'found_items'::regclass AND NOT tgisinternal
+    """)).all()
+
+
+def partition_found_items(office_partitions: int, keep_old: bool) -> None:
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print("found_items is already partitioned")
+            return
+
+        conn.execute(text("LOCK TABLE found_items IN ACCESS EXCLUSIVE MODE"))
+
+        indexes = _index_definitions(conn)
+        foreign_keys = _foreign_keys(conn)
+        triggers = [(n, d) for n, d in _triggers(conn) if n != "found_items_reserve_registry_number"]
+
+        first_year = conn.execute(text(
+            "SELECT EXTRACT(YEAR FROM MIN(created_at))::int FROM found_items"
+        )).scalar() or datetime.utcnow().year
+        last_year = datetime.utcnow().year + FOUND_ITEMS_PARTITION_YEARS_AHEAD
+
+        print(f"Creating partitioned table for {first_year}-{last_year}...")
+        conn.execute(text("""
+            CREATE TABLE found_items_partitioned
+                (LIKE found_items INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                PARTITION BY RANGE (created_at)
+        """))
+        conn.execute(text("ALTER TABLE found_items_partitioned ADD PRIMARY KEY (id, created_at)"))
+
+        for year in range(first_year, last_year + 1):
+            create_year_partition(conn, year, office_partitions, parent="found_items_partitioned")
+        conn.execute(text("CREATE TABLE found_items_default PARTITION OF found_items_partitioned DEFAULT"))
+
+        print("Copying rows...")
+        copied = conn.execute(text("INSERT INTO found_items_partitioned SELECT * FROM found_items")).rowcount
+        print(f"Copied {copied} rows")
+
+        if keep_old:
+            conn.execute(text("ALTER TABLE found_items RENAME TO found_items_unpartitioned"))
+            for name, _ in indexes:
+                conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_unpartitioned"'))
+        else:
+            conn.execute(text("DROP TABLE found_items"))
+        conn.execute(text("ALTER TABLE found_items_partitioned RENAME TO found_items"))
+
+        for name, indexdef in indexes:
+            conn.execute(text(indexdef))
+        for name, definition in foreign_keys:
+            conn.execute(text(f'ALTER TABLE found_items ADD CONSTRAINT "{name}" {definition}'))
+        for name, definition in triggers:
+            conn.execute(text(definition))
+
+        conn.execute(text(REGISTRY_NUMBERS_SQL))
+        conn.execute(text("""
+            INSERT INTO registry_numbers (registry_number, found_item_id, created_at)
+            SELECT registry_number, id, created_at FROM found_items
+            WHERE registry_number IS NOT NULL
+            ON CONFLICT DO NOTHING
+        """))
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE found_items"))
+    print("found_items is now partitioned by year of created_at")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert found_items into a partitioned table")
+    parser.add_argument(
+        "--office-partitions",
+        type=int,
+        default=FOUND_ITEMS_OFFICE_PARTITIONS,
+        help="hash sub-partitions by county_office_id per year (0 = none)",
+    )
+    parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="keep the original table as found_items_unpartitioned",
+    )
+    args = parser.parse_args()
+    partition_found_items(args.office_partitions, args.keep_old)
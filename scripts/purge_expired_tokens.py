@@ -0,0 +1,22 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.token_revocation import purge_expired_tokens
+
+
+def main():
+    db = SessionLocal()
+    try:
+        refresh, revoked = purge_expired_tokens(db)
+        print(f"Deleted {refresh} expired refresh tokens and {revoked} expired revocations")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.idempotency import purge_expired_idempotency_keys
+
+
+def main():
+    db = SessionLocal()
+    try:
+        deleted = purge_expired_idempotency_keys(db)
+        print(f"Deleted {deleted} expired idempotency keys")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config.config import SessionLocal
+from functions.delta_sync import SYNC_TOMBSTONE_RETENTION_DAYS, purge_tombstones
+
+
+def main():
+    db = SessionLocal()
+    try:
+        deleted = purge_tombstones(db)
+        print(f"Deleted {deleted} sync tombstones older than {SYNC_TOMBSTONE_RETENTION_DAYS} days")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from config.config import engine
+
+def require_found_date():
+    print("Backfilling found_items.found_date and making it NOT NULL...")
+
+    with engine.begin() as conn:
+        try:
+            # an item with no found date was at the latest found when it was registered
+            updated = conn.execute(text("""
+                UPDATE found_items
+                SET found_date = created_at AT TIME ZONE 'UTC'
+                WHERE found_date IS NULL;
+            """)).rowcount
+            print(f"Backfilled {updated} items")
+
+            conn.execute(text("""
+                ALTER TABLE found_items
+                ALTER COLUMN found_date SET NOT NULL;
+            """))
+
+            print("Column updated successfully!")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise
+
+if __name__ == "__main__":
+    require_found_date()
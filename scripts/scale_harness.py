@@ -0,0 +1,207 @@
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import func, or_, select, tuple_
+from config.config import SessionLocal, engine
+from functions.offices import OfficeItemFilters, _found_point, office_items_query
+from functions.geocoding import bounding_box
+from functions.query_plans import SEQ_SCAN_MIN_ROWS, explain, plan_nodes, seq_scanned_tables
+from models.models import ACTIVE_ITEM_STATUSES, FoundItem, FoundItemPhoto, FoundItemStatusChange, RegistryCounter
+from scripts.check_query_plans import SAMPLE_FILTERS
+from scripts.generate_synthetic_data import generate_found_items, is_synthetic_database
+
+DEFAULT_SCALES = (10_000, 100_000, 1_000_000)
+
+
+def _page(query):
+    return query.order_by(FoundItem.found_date.desc(), FoundItem.id.desc()).limit(51)
+
+
+# Every query the API and the background jobs run against found_items, with its
+# latency budget in ms at full scale. Builders get the session and the sample
+# context picked from the generated data.
+def query_catalog(ctx: dict) -> list[tuple[str, object, float]]:
+    now = datetime.now(timezone.utc)
+    catalog = [
+        ("found_items.my", lambda db: db.query(FoundItem).filter(
+            FoundItem.user_id == ctx["user_id"]).order_by(FoundItem.created_at.desc()), 250),
+        ("found_items.get", lambda db: db.query(FoundItem).filter(
+            FoundItem.id == ctx["item_id"], FoundItem.user_id == ctx["item_user_id"]), 5),
+        ("found_items.accessible", lambda db: db.query(FoundItem).filter(
+            FoundItem.id == ctx["item_id"],
+            or_(FoundItem.user_id == ctx["user_id"], FoundItem.county_office_id.in_([ctx["office_id"]]))), 5),
+        ("found_items.export_month", lambda db: db.query(FoundItem).filter(
+            FoundItem.user_id == ctx["user_id"],
+            FoundItem.created_at >= ctx["month_start"],
+            FoundItem.created_at < ctx["month_end"]).order_by(FoundItem.created_at.desc()), 100),
+        ("found_items.registry_number", lambda db: db.query(FoundItem).filter(
+            FoundItem.registry_number == ctx["registry_number"]), 5),
+        ("offices.items.next_page", lambda db: _page(office_items_query(db, ctx["office_id"], OfficeItemFilters()).filter(
+            tuple_(FoundItem.found_date, FoundItem.id) < tuple_(ctx["cursor_date"], ctx["cursor_id"]))), 50),
+        ("offices.items.count", lambda db: office_items_query(db, ctx["office_id"], OfficeItemFilters(
+            color=SAMPLE_FILTERS["color"], date_from=SAMPLE_FILTERS["date_from"])).with_entities(func.count()), 100),
+        ("offices.items.nearby_radius", lambda db: _nearby(db, ctx).order_by(
+            _found_point().op("<->")(func.point(ctx["lon"], ctx["lat"]))).limit(200), 50),
+        ("offices.items.nearby_bbox", lambda db: _nearby(db, ctx).order_by(
+            FoundItem.found_date.desc(), FoundItem.id.desc()).limit(200), 50),
+        ("duplicates.sync", lambda db: select(FoundItem.id, FoundItem.item_name).where(
+            FoundItem.county_office_id == ctx["office_id"],
+            FoundItem.created_at >= now - timedelta(days=14)).order_by(FoundItem.created_at.desc()).limit(5000), 50),
+        ("archive.batch", lambda db: select(FoundItem.id).where(
+            FoundItem.created_at < now - timedelta(days=730),
+            FoundItem.status.notin_(ACTIVE_ITEM_STATUSES)).order_by(FoundItem.created_at).limit(500)
+            .with_for_update(skip_locked=True), 100),
+        ("delta_sync.page", lambda db: select(FoundItem).where(
+            FoundItem.user_id == ctx["user_id"], FoundItem.change_seq >= 0,
+            tuple_(FoundItem.change_seq, FoundItem.id) > tuple_(0, ctx["item_id"]))
+            .order_by(FoundItem.change_seq, FoundItem.id).limit(501), 50),
+        ("status_history.item", lambda db: db.query(FoundItemStatusChange).filter(
+            FoundItemStatusChange.found_item_id == ctx["item_id"]).order_by(FoundItemStatusChange.changed_at), 5),
+        ("photos.item", lambda db: db.query(FoundItemPhoto).filter(
+            FoundItemPhoto.found_item_id == ctx["item_id"]).order_by(FoundItemPhoto.created_at), 5),
+        ("registry_counter.next", lambda db: db.query(RegistryCounter).filter_by(
+            county_office_id=ctx["office_id"], year=now.year).with_for_update(), 5),
+    ]
+
+    names = list(SAMPLE_FILTERS)
+    for size in range(len(names) + 1):
+        for combo in itertools.combinations(names, size):
+            filters = OfficeItemFilters(**{name: SAMPLE_FILTERS[name] for name in combo})
+            label = "+".join(combo) or "all"
+            catalog.append((
+                f"offices.items[{label}]",
+                lambda db, filters=filters: _page(office_items_query(db, ctx["office_id"], filters)),
+                50,
+            ))
+    return catalog
+
+
+def _nearby(db, ctx):
+    min_lon, min_lat, max_lon, max_lat = bounding_box(ctx["lat"], ctx["lon"], 2000)
+    return office_items_query(db, ctx["office_id"], OfficeItemFilters()).filter(
+        FoundItem.found_lat.isnot(None),
+        _found_point().op("<@")(func.box(func.point(min_lon, min_lat), func.point(max_lon, max_lat))),
+    )
+
+
+def sample_context(db) -> dict:
+    office_id = db.execute(
+        select(FoundItem.county_office_id).group_by(FoundItem.county_office_id)
+        .order_by(func.count().desc()).limit(1)
+    ).scalar()
+    user_id = db.execute(
+        select(FoundItem.user_id).where(FoundItem.county_office_id == office_id)
+        .group_by(FoundItem.user_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    item = db.execute(
+        select(FoundItem.id, FoundItem.user_id, FoundItem.registry_number)
+        .where(FoundItem.county_office_id == office_id).order_by(FoundItem.created_at.desc()).limit(1)
+    ).first()
+    cursor = db.execute(
+        select(FoundItem.found_date, FoundItem.id).where(FoundItem.county_office_id == office_id)
+        .order_by(FoundItem.found_date.desc(), FoundItem.id.desc()).offset(100).limit(1)
+    ).first()
+    lat, lon = db.execute(
+        select(func.avg(FoundItem.found_lat), func.avg(FoundItem.found_lon))
+        .where(FoundItem.county_office_id == office_id)
+    ).first()
+    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "office_id": office_id,
+        "user_id": user_id,
+        "item_id": item.id,
+        "item_user_id": item.user_id,
+        "registry_number": item.registry_number,
+        "cursor_date": cursor.found_date if cursor else datetime.utcnow(),
+        "cursor_id": cursor.id if cursor else item.id,
+        "lat": float(lat or 52.0),
+        "lon": float(lon or 19.0),
+        "month_start": month_start - timedelta(days=31),
+        "month_end": month_start,
+    }
+
+
+def measure(db, statement, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        runs.append(explain(db, statement, analyze=True, buffers=True))
+        # ANALYZE really runs the statement: drop its locks and anything it did
+        db.rollback()
+    plan = runs[-1]
+    top = plan["Plan"]
+    return {
+        "execution_ms": round(statistics.median(r["Execution Time"] for r in runs), 3),
+        "planning_ms": round(statistics.median(r["Planning Time"] for r in runs), 3),
+        "shared_hit_blocks": top.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": top.get("Shared Read Blocks", 0),
+        "seq_scans": sorted(t for t in seq_scanned_tables(plan) if t and t.startswith("found_items")),
+        "nodes": [n["Node Type"] for n in plan_nodes(plan)],
+    }
+
+
+def run_scale(rows: int, repeat: int, budget_multiplier: float) -> tuple[list[dict], list[str]]:
+    results, failures = [], []
+    db = SessionLocal()
+    try:
+        ctx = sample_context(db)
+        for name, build, budget in query_catalog(ctx):
+            result = measure(db, build(db), repeat)
+            result.update(name=name, rows=rows, budget_ms=budget * budget_multiplier)
+
+            problems = []
+            if result["seq_scans"] and rows >= SEQ_SCAN_MIN_ROWS:
+                problems.append(f"seq scan on {', '.join(result['seq_scans'])}")
+            if result["execution_ms"] > result["budget_ms"]:
+                problems.append(f"{result['execution_ms']} ms over the {result['budget_ms']} ms budget")
+            if problems:
+                failures.append(f"{rows} rows, {name}: {'; '.join(problems)}")
+
+            results.append(result)
+            print(f"{'FAIL' if problems else 'ok  '} {rows:>9} {name:<60} {result['execution_ms']:>9.2f} ms")
+    finally:
+        db.close()
+    return results, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grow synthetic data through each scale and check every query plan")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-multiplier", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", default="scale_report.json")
+    parser.add_argument("--allow-real-data", action="store_true", help="run even though non-synthetic users exist")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        if not args.allow_real_data and not is_synthetic_database(conn):
+            raise SystemExit(f"{engine.url.render_as_string()} holds real users; point DATABASE_URL at a scratch database")
+
+    all_results, all_failures = [], []
+    for step, target in enumerate(sorted(int(s) for s in args.scales.split(","))):
+        with engine.connect() as conn:
+            current = conn.execute(select(func.count()).select_from(FoundItem)).scalar()
+        if current < target:
+            print(f"Generating {target - current} found items...")
+            generate_found_items(target - current, seed=args.seed + step)
+
+        results, failures = run_scale(max(current, target), args.repeat, args.budget_multiplier)
+        all_results.extend(results)
+        all_failures.extend(failures)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(all_results, f, indent=2, default=str)
+
+    if all_failures:
+        print("\n".join(all_failures))
+        sys.exit(1)
+    print(f"finished, report in {args.report}")